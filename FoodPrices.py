@@ -1,45 +1,57 @@
-import pandas as pd
+import os
+import sys
 import matplotlib.pyplot as plt
 import seaborn as sns
-
-foodIndex = r"C:\Dokumenter\Datamatiker\DAT4\BI\Eksamens Projekt\FoodPricesIndex2024.xlsx"
-
-# 1. Read Excel – skip metadata
-df = pd.read_excel(foodIndex, skiprows=3, header=None)
-
-# 2. Remove column 0 (Index)
-df = df.iloc[:, 1:]
-
-# 3. Set the columns manually
-monthscolumns = ["2024M01", "2024M02", "2024M03", "2024M04", "2024M05",
-                  "2024M06", "2024M07", "2024M08", "2024M09", "2024M10",
-                  "2024M11", "2024M12"]
-df.columns = ["Category"] + monthscolumns
-
-# 4. Melt data
-df_melted = df.melt(id_vars=["Category"], var_name="Month", value_name="Index")
-
-# 5. Convert dates and clean up
-df_melted['Month'] = pd.to_datetime(df_melted['Month'], format="%YM%m", errors="coerce")
-df_melted['Index'] = pd.to_numeric(df_melted['Index'], errors='coerce')
-df_melted = df_melted.dropna(subset=["Month", "Index"])
-
-# 6. Show categories 
-print("\nAvailable categories:")
-print(df_melted['Category'].unique())
-
-# 7. Plot
-category = "01.1.1 Bread and cereals"
-subset = df_melted[df_melted['Category'] == category]
-
-plt.figure(figsize=(10,6))
-sns.lineplot(data=subset, x='Month', y='Index')
-plt.title(f"Price index over time for: {category}")
-plt.xlabel("Month")
-plt.ylabel("Index (2015=100)")
-plt.xticks(rotation=45)
-plt.grid(True)
-plt.tight_layout()
-plt.savefig(f"price_index_{category.replace(' ', '_').replace('.', '')}.png")
-plt.show()
-
+from cpi_array import CPIArray
+from cpi_store import CPIStore
+
+
+def main():
+    # Nyeste workbook kan gives som argument: python FoodPrices.py FoodPricesIndex2025.xlsx
+    # --export tegner grafer for alle kategorier uden vindue (se cpi_charts.py)
+    export = "--export" in sys.argv
+    paths = [arg for arg in sys.argv[1:] if arg != "--export"]
+    foodIndex = paths[0] if paths else r"C:\Dokumenter\Datamatiker\DAT4\BI\Eksamens Projekt\FoodPricesIndex2024.xlsx"
+
+    store = CPIStore()
+
+    # 1. Ingest – month columns are detected from the header, only months not stored yet are added
+    if os.path.exists(foodIndex):
+        new_months = store.ingest(foodIndex)
+        print("New months:", [f"{month:%Y-%m}" for month in new_months] or "none")
+
+    months = store.months()
+    if not months:
+        print("The CPI store is empty – pass the path of a FoodPricesIndex workbook.")
+        sys.exit(1)
+
+    if export:
+        from cpi_charts import CHART_DIR, export_charts
+        run = export_charts(store)["last_run"]
+        print(f"Exported {run['rendered']} charts, {run['skipped']} unchanged → {CHART_DIR}")
+        return
+
+    # 2. Category x month array – a series is a row lookup instead of filtering the long frame
+    cpi = CPIArray.from_store(store)
+    print("\nAvailable categories:")
+    print(cpi.categories)
+
+    # 3. Plot
+    category = "01.1.1 Bread and cereals"
+    subset = cpi.series(category)
+
+    plt.figure(figsize=(10,6))
+    sns.lineplot(x=subset.index, y=subset.values)
+    plt.title(f"Price index over time for: {category}")
+    plt.xlabel("Month")
+    plt.ylabel("Index (2015=100)")
+    plt.xticks(rotation=45)
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(f"price_index_{category.replace(' ', '_').replace('.', '')}.png")
+    plt.show()
+
+
+# Guard: export_charts bruger en procespulje, som genindlæser scriptet på Windows
+if __name__ == "__main__":
+    main()
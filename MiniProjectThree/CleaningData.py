@@ -1,27 +1,43 @@
-import os
-from kaggle.api.kaggle_api_extended import KaggleApi
-import pandas as pd
+"""
+Cleaning of the IBM HR Attrition dataset.
 
-# Brug lokal placering af API-nøglen
-os.environ['KAGGLE_CONFIG_DIR'] = os.path.join(os.getcwd(), '.kaggle')
+Works from the local data/WA_Fn-UseC_-HR-Employee-Attrition.csv; the Kaggle download only runs
+with --download. The cleaning stage is skipped when neither the raw file nor the cleaning
+settings have changed since the last run (recorded in data/attrition_clean.manifest.json).
 
-# Initialiser API
-api = KaggleApi()
-api.authenticate()
+The raw file is cleaned chunk by chunk. Categorical columns are encoded against a fixed
+vocabulary, so every chunk gets exactly the same dummy columns. Each chunk is written as one
+Parquet part under data/attrition_clean/ and appended to data/attrition_clean.csv. Every chunk
+is converted strictly to the hr_clean schema, so all parts have identical dtypes.
+
+    python CleaningData.py
+    python CleaningData.py --download --force --chunksize 100000
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
 
-# Download og udpak datasættet
-api.dataset_download_files('pavansubhasht/ibm-hr-analytics-attrition-dataset',
-                            path='data', unzip=True)
+import pandas as pd
 
-print("Datasæt hentet og udpakket i 'data/' mappen.")
+# Repo-roden indeholder de fælles moduler (fx dtype_schema)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dtype_schema import apply_schema
+from columnar_cache import file_digest
 
-# Indlæs datasættet
-df = pd.read_csv("data/WA_Fn-UseC_-HR-Employee-Attrition.csv")
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(PROJECT_DIR)
+RAW_PATH = os.path.join(ROOT_DIR, "data", "WA_Fn-UseC_-HR-Employee-Attrition.csv")
+CLEAN_CSV_PATH = os.path.join(PROJECT_DIR, "data", "attrition_clean.csv")
+CLEAN_PARQUET_DIR = os.path.join(PROJECT_DIR, "data", "attrition_clean")
+MANIFEST_PATH = os.path.join(PROJECT_DIR, "data", "attrition_clean.manifest.json")
+KAGGLE_DATASET = 'pavansubhasht/ibm-hr-analytics-attrition-dataset'
 
 irrelevante = [
     'EmployeeNumber', 'EmployeeCount', 'StandardHours', 'Over18'
 ]
-df = df.drop(columns=irrelevante)
 
 binære = {
     'Attrition': {'Yes': 1, 'No': 0},
@@ -29,21 +45,163 @@ binære = {
     'OverTime': {'Yes': 1, 'No': 0}
 }
 
-for kol, mapping in binære.items():
-    df[kol] = df[kol].map(mapping)
+# Faste kategorier (sorteret som get_dummies gør), så første niveau droppes ens i alle chunks
+kategoriske = {
+    'BusinessTravel': ['Non-Travel', 'Travel_Frequently', 'Travel_Rarely'],
+    'Department': ['Human Resources', 'Research & Development', 'Sales'],
+    'EducationField': ['Human Resources', 'Life Sciences', 'Marketing', 'Medical', 'Other', 'Technical Degree'],
+    'JobRole': [
+        'Healthcare Representative', 'Human Resources', 'Laboratory Technician', 'Manager',
+        'Manufacturing Director', 'Research Director', 'Research Scientist', 'Sales Executive',
+        'Sales Representative',
+    ],
+    'MaritalStatus': ['Divorced', 'Married', 'Single'],
+}
+
+
+def download(path=os.path.dirname(RAW_PATH)):
+    """
+    Henter datasættet fra Kaggle. Kun nødvendigt hvis den lokale CSV mangler eller skal opdateres.
+    """
+    from kaggle.api.kaggle_api_extended import KaggleApi
+
+    # Brug lokal placering af API-nøglen
+    os.environ['KAGGLE_CONFIG_DIR'] = os.path.join(os.getcwd(), '.kaggle')
+
+    api = KaggleApi()
+    api.authenticate()
+    api.dataset_download_files(KAGGLE_DATASET, path=path, unzip=True)
+    print(f"Datasæt hentet og udpakket i '{path}'.")
+
+
+def settings_digest(chunksize):
+    """
+    Hash of everything besides the raw file that determines the cleaned output.
+    """
+    settings = {"drop": irrelevante, "binary": binære, "categories": kategoriske, "chunksize": chunksize}
+    with open(os.path.abspath(__file__), "rb") as f:
+        code = f.read()
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    digest.update(code)
+    return digest.hexdigest()
+
+
+def clean_chunk(df):
+    """
+    Cleans one chunk of raw rows. The output columns are the same for every chunk.
+    """
+    df = apply_schema(df, "hr_raw").drop(columns=irrelevante)
+
+    for kol, mapping in binære.items():
+        df[kol] = df[kol].astype(str).map(mapping)
+        if df[kol].isna().any():
+            raise ValueError(f"Ukendte værdier i '{kol}'")
+        df[kol] = df[kol].astype('int8')
+
+    for kol, kategorier in kategoriske.items():
+        ukendte = set(df[kol].dropna().astype(str)) - set(kategorier)
+        if ukendte:
+            raise ValueError(f"Ukendte kategorier i '{kol}': {sorted(ukendte)}")
+        df[kol] = pd.Categorical(df[kol].astype(str), categories=kategorier)
+
+    df = pd.get_dummies(df, columns=list(kategoriske), drop_first=True, dtype=bool)
+    # Faste dtypes fra skemaet, ellers kunne et chunk få et andet heltals-dtype end det næste
+    return apply_schema(df, "hr_clean", strict=True)
+
+
+def _read_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(manifest):
+    tmp_path = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def is_up_to_date(raw_path, chunksize):
+    """
+    True when the outputs exist and were built from the same raw file and settings.
+    """
+    stage = _read_manifest().get("clean", {})
+    return (
+        os.path.exists(CLEAN_CSV_PATH)
+        and os.path.isdir(CLEAN_PARQUET_DIR)
+        and stage.get("settings") == settings_digest(chunksize)
+        and stage.get("raw_sha256") == file_digest(raw_path)
+    )
+
+
+def clean(raw_path=RAW_PATH, chunksize=50_000):
+    """
+    Streams the raw CSV through clean_chunk and writes the CSV and the Parquet parts.
+    The outputs are built under temporary names and swapped in when every chunk succeeded;
+    a failed run removes its temporary files and leaves the previous outputs untouched.
+    """
+    tmp_csv = f"{CLEAN_CSV_PATH}.{os.getpid()}.tmp"
+    tmp_dir = f"{CLEAN_PARQUET_DIR}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    try:
+        rows = 0
+        nulls = None
+        for i, chunk in enumerate(pd.read_csv(raw_path, chunksize=chunksize)):
+            cleaned = clean_chunk(chunk)
+            cleaned.to_parquet(os.path.join(tmp_dir, f"part-{i:05d}.parquet"), index=False)
+            cleaned.to_csv(tmp_csv, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            rows += len(cleaned)
+            nulls = cleaned.isnull().sum() if nulls is None else nulls + cleaned.isnull().sum()
+
+        if nulls is None:
+            raise ValueError(f"{raw_path} indeholder ingen rækker")
+
+        # Tjek at der ikke er nulls
+        print(nulls.sort_values(ascending=False).head())
+
+        os.replace(tmp_csv, CLEAN_CSV_PATH)
+        if os.path.isdir(CLEAN_PARQUET_DIR):
+            shutil.rmtree(CLEAN_PARQUET_DIR)
+        os.replace(tmp_dir, CLEAN_PARQUET_DIR)
+    finally:
+        # Efter et vellykket run er begge allerede flyttet på plads
+        if os.path.exists(tmp_csv):
+            os.remove(tmp_csv)
+        if os.path.isdir(tmp_dir):
+            shutil.rmtree(tmp_dir)
+
+    manifest = _read_manifest()
+    manifest["clean"] = {
+        "raw_sha256": file_digest(raw_path),
+        "settings": settings_digest(chunksize),
+        "rows": rows,
+        "parts": i + 1,
+    }
+    _write_manifest(manifest)
+    return rows
 
-kategoriske = [
-    'BusinessTravel', 'Department', 'EducationField',
-    'JobRole', 'MaritalStatus'
-]
 
-df = pd.get_dummies(df, columns=kategoriske, drop_first=True)
+def main():
+    parser = argparse.ArgumentParser(description="Clean the IBM HR attrition dataset.")
+    parser.add_argument("--input", default=RAW_PATH)
+    parser.add_argument("--download", action="store_true", help="Hent datasættet fra Kaggle først")
+    parser.add_argument("--force", action="store_true", help="Rens igen, selvom intet er ændret")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    args = parser.parse_args()
 
+    if args.download:
+        download(os.path.dirname(args.input))
 
-# Tjek at der ikke er nulls
-print(df.isnull().sum().sort_values(ascending=False).head())
+    if not args.force and is_up_to_date(args.input, args.chunksize):
+        print("Renset datasæt er allerede opdateret - intet at gøre.")
+        return
 
+    rows = clean(args.input, args.chunksize)
+    print(f"Renset datasæt ({rows} rækker) gemt som {CLEAN_CSV_PATH} og {CLEAN_PARQUET_DIR}/")
 
-df.to_csv('MiniProjectThree/data/attrition_clean.csv', index=False)
-print("Renset datasæt gemt som data/attrition_clean.csv")
 
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,22 @@
+import os
+import sys
 import streamlit as st
 import pandas as pd
-import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
-import joblib
+
+# Repo-roden indeholder de fælles moduler (fx figure_cache), projektmappen hr_models
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(PROJECT_DIR)
+for path in (ROOT_DIR, PROJECT_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from figure_cache import get_figure_cache
+from correlation_service import get_correlation_service
+from dtype_schema import apply_schema
+from shared_store import get_shared_store, source_version
+from hr_models import load_encoder, predict
 
 # Settings
 st.set_page_config(page_title="Employee Salary Insights", layout="wide")
@@ -12,13 +25,25 @@ st.title("💼 Employee Salary Prediction & Analysis")
 # Sidebar navigation
 page = st.sidebar.radio("Select Page", ["Salary Prediction", "Data Visualizations"])
 
-# Load cleaned dataset
+store = get_shared_store()
+
+# Load cleaned dataset (once per server process, shared read-only by every session)
 DATA_PATH = "data/attrition_clean.csv"
-df = pd.read_csv(DATA_PATH)
+data_version = source_version(DATA_PATH)
+df = store.frame("attrition_clean", lambda: apply_schema(pd.read_csv(DATA_PATH), "hr_clean"), data_version)
 
-# Load trained model
+# Load trained model (once per server process)
 MODEL_PATH = "models/income_regression_model.pkl"
-model = joblib.load(MODEL_PATH)
+model = store.model(MODEL_PATH)
+
+
+@st.cache_resource
+def get_encoder(model_path):
+    # Kolonnerækkefølgen gemt sammen med modellen
+    return load_encoder(model_path)
+
+
+encoder = get_encoder(MODEL_PATH)
 
 # -------------------- PAGE 1: SALARY PREDICTION --------------------
 if page == "Salary Prediction":
@@ -34,14 +59,15 @@ if page == "Salary Prediction":
     performance = st.selectbox("Performance Rating", [1, 2, 3, 4])
     satisfaction = st.selectbox("Environmental Satisfaction", [1, 2, 3, 4])
 
-    overtime_binary = 1 if overtime == "Yes" else 0
-
-    features = np.array([[age, job_level, working_years, years_at_company,
-                          overtime_binary, distance, education, performance, satisfaction]])
+    features = encoder.transform_one({
+        'Age': age, 'JobLevel': job_level, 'TotalWorkingYears': working_years,
+        'YearsAtCompany': years_at_company, 'OverTime': overtime, 'DistanceFromHome': distance,
+        'Education': education, 'PerformanceRating': performance, 'EnvironmentSatisfaction': satisfaction,
+    })
 
     if st.button("🔍 Predict Monthly Salary"):
 
-        prediction = model.predict(features)[0]
+        prediction = predict(model, features)[0]
         lower = int(prediction * 0.9)
         upper = int(prediction * 1.1)
 
@@ -55,6 +81,8 @@ if page == "Salary Prediction":
 elif page == "Data Visualizations":
     st.subheader("📊 Explore Salary-related Patterns")
 
+    figure_cache = get_figure_cache()
+
     option = st.radio("Choose a visualization:", [
         "Age vs. Salary (Scatterplot)",
         "Job Level vs. Salary (Boxplot)",
@@ -63,28 +91,38 @@ elif page == "Data Visualizations":
 
     if option == "Age vs. Salary (Scatterplot)":
         st.write("Relationship between age and monthly income.")
-        fig, ax = plt.subplots(figsize=(10, 6))
-        sns.scatterplot(data=df, x="Age", y="MonthlyIncome", alpha=0.6, ax=ax)
-        ax.set_xlabel("Age")
-        ax.set_ylabel("Monthly Income (units)")
-        ax.set_title("Age vs. Monthly Income")
-        ax.grid(True)
-        st.pyplot(fig)
+
+        def draw():
+            fig, ax = plt.subplots(figsize=(10, 6))
+            sns.scatterplot(data=df, x="Age", y="MonthlyIncome", alpha=0.6, ax=ax)
+            ax.set_xlabel("Age")
+            ax.set_ylabel("Monthly Income (units)")
+            ax.set_title("Age vs. Monthly Income")
+            ax.grid(True)
+            return fig
 
     elif option == "Job Level vs. Salary (Boxplot)":
         st.write("Salary distribution by job level.")
-        fig, ax = plt.subplots(figsize=(8, 6))
-        sns.boxplot(data=df, x="JobLevel", y="MonthlyIncome", ax=ax)
-        ax.set_xlabel("Job Level")
-        ax.set_ylabel("Monthly Income (units)")
-        ax.set_title("Monthly Income per Job Level")
-        st.pyplot(fig)
+
+        def draw():
+            fig, ax = plt.subplots(figsize=(8, 6))
+            sns.boxplot(data=df, x="JobLevel", y="MonthlyIncome", ax=ax)
+            ax.set_xlabel("Job Level")
+            ax.set_ylabel("Monthly Income (units)")
+            ax.set_title("Monthly Income per Job Level")
+            return fig
 
     elif option == "Correlation Matrix":
         st.write("Correlation between numeric variables.")
-        corr = df.corr(numeric_only=True)
 
-        fig, ax = plt.subplots(figsize=(14, 12))
-        sns.heatmap(corr, cmap="coolwarm", center=0, linewidths=0.5, ax=ax)
-        ax.set_title("Correlation Matrix")
-        st.pyplot(fig)
+        def draw():
+            correlations = get_correlation_service().ensure("Salary Insights", df, version=data_version)
+            corr = correlations.matrix("Salary Insights")
+            fig, ax = plt.subplots(figsize=(14, 12))
+            sns.heatmap(corr, cmap="coolwarm", center=0, linewidths=0.5, ax=ax)
+            ax.set_title("Correlation Matrix")
+            return fig
+
+    # Renderes kun ved første visning; derefter vises de gemte PNG-bytes
+    key = figure_cache.make_key("Salary Insights", "Data Visualizations", data_version, option=option)
+    st.image(figure_cache.render(key, draw))
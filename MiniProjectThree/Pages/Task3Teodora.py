@@ -1,4 +1,5 @@
 import os
+import sys
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
@@ -9,24 +10,59 @@ from sklearn.tree import DecisionTreeClassifier, plot_tree
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 import joblib
 
+# Make the repository root and the project folder importable for the shared modules
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(PROJECT_DIR)
+for path in (ROOT_DIR, PROJECT_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from correlation_service import get_correlation_service
+from shared_store import source_version
+from dtype_schema import apply_schema
+from model_registry import get_model_registry, training_key
+from hr_models import FeatureEncoder, encoder_path
+from tree_compiler import compile_tree
+from info_gain import entropy, information_gain
+
+MODEL_NAME = "attrition_tree"
+
 class EmployeeAttritionAnalysis:
     def __init__(self, data_path):
         self.data_path = data_path
+        # Data afhænger kun af CSV-filen, så dens version bruges som nøgle i de delte caches
+        self.data_version = source_version(data_path)
 
         # Load data
         try:
-            self.df = pd.read_csv(self.data_path)
+            self.df = apply_schema(pd.read_csv(self.data_path), "hr_raw")
             st.success(f"Data loaded successfully from: {self.data_path}")
         except Exception as e:
             st.error(f"Failed to load data: {e}")
             raise
 
         # Map Attrition to binary and encode categorical variables
-        self.df['Attrition'] = self.df['Attrition'].map({'Yes': 1, 'No': 0})
-        self.df = pd.get_dummies(self.df, drop_first=True)
-
-    def interpret_correlation(self):
-        corr = self.df.corr()["Attrition"].sort_values(key=abs, ascending=False)
+        self.df['Attrition'] = self.df['Attrition'].map({'Yes': 1, 'No': 0}).astype('int8')
+        self.raw_df = self.df
+        self.df = pd.get_dummies(self.df, drop_first=True, dtype=bool)
+
+    def feature_encoder(self, columns):
+        """
+        Encoder with the training vocabulary and the model's column order, saved with the model.
+        """
+        return FeatureEncoder.from_frame(self.raw_df.drop(columns='Attrition'), list(columns))
+
+    def attrition_correlation(self):
+        """
+        Correlation of every feature with Attrition, sorted by absolute strength.
+        Served by the shared correlation service, so it is computed once per dataset version.
+        """
+        service = get_correlation_service().ensure("attrition", self.df, version=self.data_version)
+        return service.column("attrition", "Attrition").sort_values(key=abs, ascending=False)
+
+    def interpret_correlation(self, corr=None):
+        if corr is None:
+            corr = self.attrition_correlation()
         strongest_feature = corr.index[1]
         strongest_corr = corr.iloc[1]
 
@@ -67,10 +103,10 @@ class EmployeeAttritionAnalysis:
 
     def show_attrition_correlation(self):
         st.write("### Correlation with Attrition")
-        corr = self.df.corr()["Attrition"].sort_values(key=abs, ascending=False)
+        corr = self.attrition_correlation()
         st.write(corr)
 
-        interpretation = self.interpret_correlation()
+        interpretation = self.interpret_correlation(corr)
         st.info(interpretation)
 
         fig, ax = plt.subplots(figsize=(10, 14))
@@ -79,25 +115,38 @@ class EmployeeAttritionAnalysis:
         ax.tick_params(axis='y', labelsize=10)
         st.pyplot(fig)
 
+    def fit_attrition_tree(self, X, y, clf):
+        """
+        Fits clf on a 70/30 split and returns it with its evaluation report.
+        """
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+        clf.fit(X_train, y_train)
+        y_pred = clf.predict(X_test)
+        report = {
+            "accuracy": accuracy_score(y_test, y_pred),
+            "classification_report": classification_report(y_test, y_pred),
+            "confusion_matrix": confusion_matrix(y_test, y_pred),
+        }
+        return clf, report
+
     def train_and_predict(self):
         X = self.df.drop('Attrition', axis=1)
         y = self.df['Attrition']
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-
         clf = DecisionTreeClassifier(criterion='entropy', max_depth=5, random_state=42, class_weight='balanced')
-        clf.fit(X_train, y_train)
-        y_pred = clf.predict(X_test)
 
-        # Save the model after training
-        joblib.dump(clf, "decision_tree_model.joblib")
+        # Only refit when the data, features, hyperparameters or library versions have changed
+        key = training_key(X, y, clf)
+        entry = get_model_registry().get_or_train(
+            MODEL_NAME, key, lambda: self.fit_attrition_tree(X, y, clf), encoder=self.feature_encoder(X.columns)
+        )
+        clf, report = entry["model"], entry["report"]
 
-        accuracy = accuracy_score(y_test, y_pred)
-        st.write(f"### Accuracy: {accuracy * 100:.2f}%")
+        st.write(f"### Accuracy: {report['accuracy'] * 100:.2f}%")
 
         st.write("### Classification Report")
-        st.text(classification_report(y_test, y_pred))
+        st.text(report["classification_report"])
 
-        cm = confusion_matrix(y_test, y_pred)
+        cm = report["confusion_matrix"]
         st.write("### Confusion Matrix")
         st.write(self.interpret_confusion_matrix(cm))
 
@@ -123,13 +172,8 @@ Entropy measures the unpredictability or impurity of a node in decision trees.
 - Entropy is **1** when classes are perfectly mixed (e.g., 50/50).  
         """)
 
-        def compute_entropy(p):
-            if p == 0 or p == 1:
-                return 0
-            return -p * np.log2(p) - (1 - p) * np.log2(1 - p)
-
         p_values = np.linspace(0, 1, 200)
-        entropy_values = [compute_entropy(p) for p in p_values]
+        entropy_values = entropy(p_values)
 
         fig, ax = plt.subplots()
         ax.plot(p_values, entropy_values, color='darkorange', linewidth=2)
@@ -139,15 +183,41 @@ Entropy measures the unpredictability or impurity of a node in decision trees.
         ax.grid(True)
         st.pyplot(fig)
 
+    def show_information_gain(self):
+        st.write("### Information Gain Ranking")
+        st.markdown("""
+Information gain is the drop in entropy of Attrition achieved by the best single split on a feature
+(the split a decision tree would choose at the root). Unlike correlation, it also captures non-linear
+and threshold effects.
+        """)
+        ranking = information_gain(self.df.drop('Attrition', axis=1), self.df['Attrition'])
+        st.dataframe(ranking)
+
+        top = ranking.head(20)
+        fig, ax = plt.subplots(figsize=(10, 8))
+        sns.barplot(x=top['information_gain'], y=top.index, ax=ax)
+        ax.set_title("Top 20 Features by Information Gain")
+        ax.set_xlabel("Information gain (bits)")
+        st.pyplot(fig)
+
     def load_model(self, model_path="decision_tree_model.joblib"):
+        """
+        Returns (model, encoder): the model most recently trained or reused from the registry, else the
+        committed file with its encoder sidecar.
+        """
         try:
+            entry = get_model_registry().latest(MODEL_NAME)
+            if entry is not None and entry.get("encoder"):
+                return entry["model"], FeatureEncoder.from_dict(entry["encoder"])
             model = joblib.load(model_path)
-            return model
+            if os.path.exists(encoder_path(model_path)):
+                return model, FeatureEncoder.load(encoder_path(model_path))
+            return model, self.feature_encoder(model.feature_names_in_)
         except Exception as e:
             st.error(f"Failed to load model: {e}")
-            return None
+            return None, None
 
-    def predict_user_input(self, clf):
+    def predict_user_input(self, clf, encoder):
         st.write("### Employee Attrition Prediction")
 
         # Example user inputs (adjust these to features available in your dataset)
@@ -155,20 +225,18 @@ Entropy measures the unpredictability or impurity of a node in decision trees.
         monthly_income = st.number_input("Monthly Income", min_value=0, step=100)
         total_working_years = st.number_input("Total Working Years", min_value=0, step=1)
 
-        overtime_val = 1 if overtime == "Yes" else 0
-
-        # Prepare input data with all required features as zeros
-        input_data = pd.DataFrame(np.zeros((1, len(self.df.columns)-1)), columns=self.df.drop("Attrition", axis=1).columns)
-        if 'OverTime_Yes' in input_data.columns:
-            input_data['OverTime_Yes'] = overtime_val
-        if 'MonthlyIncome' in input_data.columns:
-            input_data['MonthlyIncome'] = monthly_income
-        if 'TotalWorkingYears' in input_data.columns:
-            input_data['TotalWorkingYears'] = total_working_years
+        # Encode straight into the model's column order with the vocabulary saved at training time.
+        # Only three inputs are asked for; every other feature is 0 as in the original example.
+        input_row = encoder.transform_one({
+            'OverTime': overtime,
+            'MonthlyIncome': monthly_income,
+            'TotalWorkingYears': total_working_years,
+        }, fill_missing=0)
 
-        # Predict
-        prediction = clf.predict(input_data)[0]
-        proba = clf.predict_proba(input_data)[0][1]
+        # Predict with the compiled tree (plain node arrays, no per-call sklearn validation)
+        probabilities = compile_tree(clf).predict_proba_one(input_row)
+        prediction = clf.classes_[probabilities.argmax()]
+        proba = probabilities[list(clf.classes_).index(1)]
 
         st.write(f"Prediction: {'Attrition' if prediction == 1 else 'No Attrition'}")
         st.write(f"Probability of attrition: {proba:.2f}")
@@ -186,6 +254,7 @@ def main():
         "Correlation with Attrition",
         "Train and Predict",
         "Entropy Visualization",
+        "Information Gain Ranking",
         "Predict Attrition (User Input)"
     ])
 
@@ -199,10 +268,12 @@ def main():
         analysis.train_and_predict()
     elif choice == "Entropy Visualization":
         analysis.show_entropy_plot()
+    elif choice == "Information Gain Ranking":
+        analysis.show_information_gain()
     elif choice == "Predict Attrition (User Input)":
-        clf = analysis.load_model()
+        clf, encoder = analysis.load_model()
         if clf:
-            analysis.predict_user_input(clf)
+            analysis.predict_user_input(clf, encoder)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,123 @@
+"""
+Scores a whole HR CSV file with the saved income and attrition models.
+
+The input is read in chunks and the chunks are scored in a process pool. Each worker loads
+the models once. At most a few chunks per worker are in flight at any time, and results are
+written to the output CSV in input order as soon as they are ready, so memory use depends on
+the chunk size rather than the file size.
+
+The attrition model needs the raw HR columns, so cleaned rows (data/attrition_clean.csv) can
+only be scored with --models income. The CSV header is checked against every selected model
+before any chunk is scored.
+
+    python batch_score.py data/WA_Fn-UseC_-HR-Employee-Attrition.csv predictions.csv
+    python batch_score.py big.csv out.csv --chunksize 50000 --workers 8 --models attrition
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from hr_models import (
+    ATTRITION_MODEL_PATH, INCOME_MODEL_PATH, encode_frame, load_encoder, load_model,
+)
+
+MODEL_PATHS = {"income": INCOME_MODEL_PATH, "attrition": ATTRITION_MODEL_PATH}
+
+# Modellerne indlæses én gang pr. workerproces (via initializer) i stedet for pr. chunk
+_models = {}
+
+
+def _load_models(model_names):
+    for name in model_names:
+        _models[name] = (load_model(MODEL_PATHS[name]), load_encoder(MODEL_PATHS[name]))
+
+
+def score_chunk(chunk, keep_columns=True):
+    """
+    Returns the predictions for one chunk, optionally next to the original columns.
+    """
+    result = chunk if keep_columns else pd.DataFrame(index=chunk.index)
+    result = result.copy()
+
+    if "income" in _models:
+        model, encoder = _models["income"]
+        result["PredictedMonthlyIncome"] = model.predict(encode_frame(chunk, encoder))
+
+    if "attrition" in _models:
+        model, encoder = _models["attrition"]
+        proba = model.predict_proba(encode_frame(chunk, encoder))
+        positive = list(model.classes_).index(1)
+        result["PredictedAttrition"] = model.classes_[proba.argmax(axis=1)]
+        result["AttritionProbability"] = proba[:, positive]
+
+    return result
+
+
+def check_columns(input_path, model_names):
+    """
+    Raises ValueError when the CSV header lacks features that one of the models needs.
+    """
+    columns = pd.read_csv(input_path, nrows=0).columns
+    for name in model_names:
+        missing = load_encoder(MODEL_PATHS[name]).missing(columns)
+        if missing:
+            raise ValueError(f"{input_path} is missing features for the {name} model: {missing}")
+
+
+def score_file(input_path, output_path, model_names=("income", "attrition"), chunksize=10_000, workers=None, keep_columns=True):
+    """
+    Streams input_path through the models and writes output_path. Returns the number of scored rows.
+    """
+    check_columns(input_path, model_names)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    rows = 0
+    first = True
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_models, initargs=(tuple(model_names),)) as pool:
+        pending = deque()
+
+        def write_next():
+            nonlocal rows, first
+            scored = pending.popleft().result()
+            scored.to_csv(output_path, mode="w" if first else "a", header=first, index=False)
+            rows += len(scored)
+            first = False
+
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            if len(pending) >= max_in_flight:
+                write_next()
+            pending.append(pool.submit(score_chunk, chunk, keep_columns))
+
+        while pending:
+            write_next()
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-score an HR CSV file with the saved models.")
+    parser.add_argument("input", help="CSV file with raw HR rows (cleaned rows only with --models income)")
+    parser.add_argument("output", help="CSV file to write the predictions to")
+    parser.add_argument("--models", nargs="+", choices=sorted(MODEL_PATHS), default=["income", "attrition"])
+    parser.add_argument("--chunksize", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    parser.add_argument("--predictions-only", action="store_true", help="Write only the prediction columns")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        rows = score_file(args.input, args.output, args.models, args.chunksize, args.workers, not args.predictions_only)
+    except ValueError as e:
+        sys.exit(f"❌ {e}")
+    elapsed = time.perf_counter() - start
+    print(f"✅ Scored {rows} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import json
+import math
+import numbers
+import os
+import threading
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Stier til de gemte modeller, uafhængigt af hvilken mappe scriptet startes fra
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+INCOME_MODEL_PATH = os.path.join(PROJECT_DIR, "models", "income_regression_model.pkl")
+ATTRITION_MODEL_PATH = os.path.join(PROJECT_DIR, "decision_tree_model.joblib")
+
+# Features som indkomstmodellen er trænet på (samme rækkefølge som i train_regression_model.py)
+INCOME_FEATURES = [
+    'Age', 'JobLevel', 'TotalWorkingYears', 'YearsAtCompany', 'OverTime',
+    'DistanceFromHome', 'Education', 'PerformanceRating', 'EnvironmentSatisfaction'
+]
+
+# Binære tekstværdier, som de er kodet i CleaningData.py
+BINARY_VALUES = {'Yes': 1, 'No': 0, 'Male': 1, 'Female': 0}
+
+
+def load_model(path):
+    return joblib.load(path)
+
+
+def feature_names(model, default=None):
+    """
+    Returns the feature names a fitted model expects, in training order.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    if names is None:
+        if default is None:
+            raise ValueError("The model has no stored feature names; pass them explicitly.")
+        return list(default)
+    return list(names)
+
+
+class FeatureEncoder:
+    """
+    Compiled single-row encoder saved next to each model.
+
+    Holds the model's column order and the category vocabulary seen in training, so a dict of
+    raw inputs (e.g. {'OverTime': 'Yes', 'JobRole': 'Manager', 'Age': 35}) is written straight
+    into a preallocated NumPy row. Keys may also be model columns themselves ('OverTime_Yes').
+    Every feature must be given: a missing numeric feature or categorical field raises instead
+    of silently being scored as 0, and so does None, NaN or infinity as a numeric value.
+    """
+
+    def __init__(self, columns, categories=None):
+        self.columns = [str(column) for column in columns]
+        self.categories = {field: [str(value) for value in values] for field, values in (categories or {}).items()}
+
+        # Opslagstabeller bygges én gang, så transform_one kun laver dict-opslag
+        self._numeric = {column: i for i, column in enumerate(self.columns)}
+        self._dummies = {
+            field: {value: self._numeric.get(f"{field}_{value}") for value in values}
+            for field, values in self.categories.items()
+        }
+        # Påkrævede input: numeriske kolonner og de kategoriske felter der har mindst én kolonne
+        self._field_of_dummy = {
+            self.columns[index]: field for field, slots in self._dummies.items() for index in slots.values() if index is not None
+        }
+        self._required = frozenset(
+            [column for column in self.columns if column not in self._field_of_dummy]
+            + [field for field, slots in self._dummies.items() if any(slot is not None for slot in slots.values())]
+        )
+        self._local = threading.local()
+
+    @classmethod
+    def from_frame(cls, df, columns):
+        """
+        Builds the encoder from the raw training frame and the model's columns.
+        Every non-numeric column that is not itself a model column becomes a categorical field.
+        """
+        categories = {
+            column: sorted(df[column].dropna().astype(str).unique())
+            for column in df.columns
+            if column not in columns
+            and not pd.api.types.is_numeric_dtype(df[column])
+            and not pd.api.types.is_bool_dtype(df[column])
+        }
+        return cls(columns, categories)
+
+    def _set(self, row, key, value):
+        if key in self._numeric:
+            if isinstance(value, str):
+                if value not in BINARY_VALUES:
+                    raise ValueError(f"Cannot encode {value!r} for numeric feature '{key}'")
+                value = BINARY_VALUES[value]
+            elif not isinstance(value, numbers.Real) or not math.isfinite(value):
+                # None og NaN ville ellers blive skrevet som NaN og scoret af modellen
+                raise ValueError(f"Invalid value {value!r} for numeric feature '{key}'")
+            row[self._numeric[key]] = value
+        elif key in self._dummies:
+            slots = self._dummies[key]
+            value = str(value)
+            if value not in slots:
+                raise ValueError(f"Unknown value {value!r} for '{key}', expected one of {list(slots)}")
+            # Det første niveau er droppet ved træning og har ingen kolonne
+            if slots[value] is not None:
+                row[slots[value]] = 1
+        else:
+            raise ValueError(f"Unknown feature '{key}'")
+
+    def missing(self, keys):
+        """
+        Required features (numeric columns or categorical fields) not covered by `keys`.
+        A categorical field also counts as given when one of its dummy columns is a key.
+        """
+        missing = self._required.difference(keys)
+        if missing:
+            missing -= {self._field_of_dummy[key] for key in keys if key in self._field_of_dummy}
+        return sorted(missing)
+
+    def _check_complete(self, keys, fill_missing):
+        if fill_missing is None:
+            missing = self.missing(keys)
+            if missing:
+                raise ValueError(f"Missing features: {missing}")
+
+    def transform_one(self, inputs, fill_missing=None):
+        """
+        Encodes one dict into a (1, n_features) row. The row is a buffer reused per thread,
+        so use it before the next call. Missing features raise, unless fill_missing is given:
+        then missing numeric features get that value and missing fields their base level.
+        """
+        self._check_complete(inputs, fill_missing)
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.zeros((1, len(self.columns)))
+        row.fill(0)
+        if fill_missing:
+            row[0, [self._numeric[column] for column in self._required if column in self._numeric]] = fill_missing
+        for key, value in inputs.items():
+            self._set(row[0], key, value)
+        return row
+
+    def transform(self, records, fill_missing=None):
+        """
+        Encodes a list of dicts into a new (len(records), n_features) array.
+        """
+        rows = np.zeros((len(records), len(self.columns)))
+        for row, record in zip(rows, records):
+            self._check_complete(record, fill_missing)
+            if fill_missing:
+                row[[self._numeric[column] for column in self._required if column in self._numeric]] = fill_missing
+            for key, value in record.items():
+                self._set(row, key, value)
+        return rows
+
+    def to_dict(self):
+        return {"columns": self.columns, "categories": self.categories}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["columns"], data.get("categories"))
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def encoder_path(model_path):
+    """
+    Path of the encoder sidecar saved next to a model file.
+    """
+    return os.path.splitext(model_path)[0] + ".encoder.json"
+
+
+def load_encoder(model_path):
+    return FeatureEncoder.load(encoder_path(model_path))
+
+
+def predict(model, rows, proba=False):
+    """
+    Runs predict (or predict_proba) on encoded rows. The rows are already in the model's column
+    order, so sklearn's warning about missing feature names is silenced.
+    """
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return model.predict_proba(rows) if proba else model.predict(rows)
+
+
+def encode_frame(df, encoder):
+    """
+    Encodes a raw or cleaned HR DataFrame into the encoder's (the model's) feature columns.
+    Categorical fields are dummy-encoded against the training vocabulary, so every chunk gets
+    the same columns whichever categories it happens to contain. Like FeatureEncoder, it raises
+    on missing features and on values that were not seen in training; other columns are ignored.
+    """
+    missing = encoder.missing(df.columns)
+    if missing:
+        raise ValueError(f"Missing features: {missing}")
+
+    df = df.copy()
+    for column in df.columns:
+        if column in encoder._numeric and not pd.api.types.is_numeric_dtype(df[column]):
+            mapped = df[column].map(BINARY_VALUES)
+            unknown = df[column][mapped.isna() & df[column].notna()]
+            if len(unknown):
+                raise ValueError(f"Cannot encode {sorted(map(str, unknown.unique()))} for numeric feature '{column}'")
+            df[column] = mapped
+
+    fields = [field for field in encoder.categories if field in df.columns and field not in encoder._numeric]
+    for field in fields:
+        values = df[field].astype(str)
+        unknown = set(values.unique()) - set(encoder.categories[field])
+        if unknown:
+            raise ValueError(f"Unknown values {sorted(unknown)} for '{field}', expected one of {encoder.categories[field]}")
+        df[field] = pd.Categorical(values, categories=encoder.categories[field])
+
+    columns = [column for column in df.columns if column in encoder._numeric or column in fields]
+    encoded = pd.get_dummies(df[columns], columns=fields, dtype=np.int8)
+    return encoded.reindex(columns=encoder.columns, fill_value=0).astype(np.float64)
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+
+
+def entropy(p):
+    """
+    Binary entropy in bits for an array of class-1 proportions (0 where p is 0 or 1).
+    """
+    p = np.asarray(p, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = -p * np.log2(p) - (1 - p) * np.log2(1 - p)
+    return np.nan_to_num(h, nan=0.0)
+
+
+def class_entropy(counts):
+    """
+    Entropy in bits of class counts along the last axis (works for any number of classes).
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    totals = counts.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = counts / totals
+        terms = np.where(p > 0, -p * np.log2(p), 0.0)
+    return terms.sum(axis=-1)
+
+
+def _block_gains(X, codes, n_classes):
+    """
+    Best single-split information gain for every column of X (n_rows x n_cols).
+    One argsort per column, then cumulative class counts give every split's children at once.
+    Rows where a column is NaN are left out of that column: its parent and children only
+    count the rows with a known value.
+    """
+    n = X.shape[0]
+    order = np.argsort(X, axis=0, kind="stable")
+    xs = np.take_along_axis(X, order, axis=0)
+    ys = codes[order]
+    cols = np.arange(X.shape[1])
+
+    # argsort lægger NaN sidst, så de kendte værdier er de første n_known rækker i hver kolonne
+    known = ~np.isnan(xs)
+    n_known = known.sum(axis=0)
+
+    # Venstre barn efter række i: kumulerede klasseantal; højre barn er resten af de kendte rækker
+    counts = np.stack([np.cumsum((ys == c) & known, axis=0) for c in range(n_classes)], axis=-1)
+    parent_counts = counts[np.maximum(n_known - 1, 0), cols]
+    left = counts[:-1]
+    right = parent_counts - left
+    n_left = np.arange(1, n)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        child = (n_left * class_entropy(left) + (n_known - n_left) * class_entropy(right)) / n_known
+
+    # Kun split mellem to forskellige, kendte værdier er gyldige
+    valid = (xs[1:] != xs[:-1]) & known[1:]
+    child = np.where(valid, child, np.inf)
+    best = child.argmin(axis=0)
+    best_child = child[best, cols]
+    has_split = np.isfinite(best_child)
+
+    gain = np.where(has_split, class_entropy(parent_counts) - best_child, 0.0)
+    threshold = np.where(has_split, (xs[best, cols] + xs[np.minimum(best + 1, n - 1), cols]) / 2, np.nan)
+    return gain, threshold
+
+
+def information_gain(X, y, block_bytes=256 << 20):
+    """
+    Ranks every column of X by the information gain of its best single split on y.
+
+    Returns a DataFrame with the gain, the split threshold (x <= threshold goes left) and the
+    gain ratio, sorted by gain. Columns are processed in blocks so the sorted copies and the
+    cumulative counts stay within roughly block_bytes of memory. Missing (NaN) values are
+    dropped per column, so they are never split candidates.
+    """
+    X = pd.DataFrame(X)
+    values = X.to_numpy(dtype=np.float64)
+    classes, codes = np.unique(np.asarray(y), return_inverse=True)
+    n_classes = len(classes)
+
+    # Bytes pr. kolonne: sortering, kumulerede antal og entropier
+    per_column = max(1, values.shape[0] * 8 * (4 + 2 * n_classes))
+    block = max(1, block_bytes // per_column)
+
+    gains, thresholds = [], []
+    for start in range(0, values.shape[1], block):
+        gain, threshold = _block_gains(values[:, start:start + block], codes, n_classes)
+        gains.append(gain)
+        thresholds.append(threshold)
+
+    gain = np.concatenate(gains)
+    threshold = np.concatenate(thresholds)
+
+    # Gain ratio: gain delt med split-informationen (entropien af venstre/højre-andelen)
+    # Andelen regnes af de kendte værdier i hver kolonne
+    left_share = (values <= threshold).sum(axis=0) / np.maximum((~np.isnan(values)).sum(axis=0), 1)
+    split_info = entropy(left_share)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(split_info > 0, gain / split_info, 0.0)
+
+    ranking = pd.DataFrame(
+        {"information_gain": gain, "threshold": threshold, "gain_ratio": ratio},
+        index=X.columns,
+    )
+    return ranking.sort_values("information_gain", ascending=False)
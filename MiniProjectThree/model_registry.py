@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+# Registret ligger ved siden af de øvrige modeller, uafhængigt af hvilken mappe Streamlit startes fra
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+REGISTRY_DIR = os.environ.get("BI_MODEL_REGISTRY_DIR", os.path.join(PROJECT_DIR, "models", "registry"))
+DEFAULT_KEEP = 5
+
+
+def training_key(X, y, estimator):
+    """
+    Content hash of everything that determines a fitted model: the training data, the feature
+    list, the estimator class and its hyperparameters, and the library versions.
+    """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    spec = {
+        "features": [str(column) for column in X.columns],
+        "estimator": f"{type(estimator).__module__}.{type(estimator).__name__}",
+        "params": estimator.get_params(),
+        "versions": {"sklearn": sklearn.__version__, "numpy": np.__version__, "pandas": pd.__version__},
+    }
+    digest.update(json.dumps(spec, sort_keys=True, default=repr).encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+class ModelRegistry:
+    """
+    Stores fitted models with their evaluation report under a content-addressed key.
+
+    Each entry is one joblib file, {name}/{key}.joblib, holding {"model", "encoder", "report", "created"}.
+    Files are written to a temporary name and renamed into place, so concurrent writers never
+    leave a half-written artifact. A file's mtime is the last time its entry was trained or
+    reused, so latest() is the model most recently used and only the `keep` most recently used
+    entries per name are kept.
+    """
+
+    def __init__(self, root=REGISTRY_DIR, keep=DEFAULT_KEEP):
+        self.root = root
+        self.keep = keep
+        self._entries = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, name, key):
+        with self._lock:
+            return self._locks.setdefault((name, key), threading.Lock())
+
+    def _path(self, name, key):
+        return os.path.join(self.root, name, f"{key}.joblib")
+
+    def get(self, name, key):
+        """
+        Returns the stored entry for key, or None if the model has not been trained yet.
+        """
+        entry = self._entries.get((name, key))
+        if entry is None:
+            path = self._path(name, key)
+            if not os.path.exists(path):
+                return None
+            entry = self._entries[(name, key)] = joblib.load(path)
+        return entry
+
+    def put(self, name, key, model, report=None, encoder=None):
+        # The encoder is stored as its plain dict, so entries load without the encoder class
+        encoder = encoder.to_dict() if encoder is not None else None
+        entry = {"model": model, "encoder": encoder, "report": report or {}, "created": time.time()}
+        path = self._path(name, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(entry, tmp_path)
+        os.replace(tmp_path, path)
+        self._entries[(name, key)] = entry
+        self._prune(name)
+        return entry
+
+    def get_or_train(self, name, key, train, encoder=None):
+        """
+        Returns the entry for key, calling train() -> (model, report) only if it is not stored yet.
+        """
+        with self._key_lock(name, key):
+            entry = self.get(name, key)
+            if entry is None:
+                model, report = train()
+                entry = self.put(name, key, model, report, encoder)
+            else:
+                self._touch(name, key)
+            return entry
+
+    def _touch(self, name, key):
+        # Et cache-hit gør entry'et til det senest brugte for latest(), keys() og _prune
+        try:
+            os.utime(self._path(name, key))
+        except OSError:
+            pass
+
+    def latest(self, name):
+        """
+        Returns the most recently trained or reused entry for name, or None if there is none.
+        """
+        keys = self.keys(name)
+        return self.get(name, keys[0]) if keys else None
+
+    def keys(self, name):
+        """
+        Stored keys for name, most recently trained or reused first.
+        """
+        folder = os.path.join(self.root, name)
+        if not os.path.isdir(folder):
+            return []
+        files = [entry for entry in os.listdir(folder) if entry.endswith(".joblib")]
+        files.sort(key=lambda entry: os.path.getmtime(os.path.join(folder, entry)), reverse=True)
+        return [entry.removesuffix(".joblib") for entry in files]
+
+    def _prune(self, name):
+        for key in self.keys(name)[self.keep:]:
+            self._entries.pop((name, key), None)
+            try:
+                os.remove(self._path(name, key))
+            except OSError:
+                pass
+
+
+_model_registry = None
+_model_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """
+    Returns the registry shared by every session in this server process.
+    """
+    global _model_registry
+    with _model_registry_lock:
+        if _model_registry is None:
+            _model_registry = ModelRegistry()
+        return _model_registry
@@ -0,0 +1,260 @@
+"""
+Local HTTP prediction server for the income regression model and the attrition decision tree.
+
+Both models are loaded once at start-up. Concurrent requests are collected into micro-batches
+(up to --max-batch rows or --max-wait-ms milliseconds) and scored with one vectorized predict
+per batch. GET /metrics reports p50/p99 latency, throughput and the average batch size.
+
+The body is a JSON object with "instances" (a non-empty list of objects) or "features" (one
+object). Every feature the model was trained on must be present; a malformed body, a missing
+feature, a null or non-finite number or an unknown category gets a 400 response.
+
+    python prediction_server.py --port 8000
+    curl -X POST localhost:8000/predict/income -d '{"instances": [{"Age": 35, "JobLevel": 2,
+        "TotalWorkingYears": 10, "YearsAtCompany": 5, "OverTime": "Yes", "DistanceFromHome": 7,
+        "Education": 3, "PerformanceRating": 3, "EnvironmentSatisfaction": 2}]}'
+    # The attrition model needs every column of the raw HR CSV except Attrition
+    curl -X POST localhost:8000/predict/attrition -d @employee.json
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from hr_models import ATTRITION_MODEL_PATH, INCOME_MODEL_PATH, load_encoder, load_model, predict
+from tree_compiler import compile_tree
+
+
+class LatencyStats:
+    """
+    Keeps the most recent request latencies and batch sizes for the /metrics endpoint.
+    """
+
+    def __init__(self, window=10_000):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_request(self, seconds):
+        with self._lock:
+            self.requests += 1
+            self.latencies.append(seconds)
+
+    def record_batch(self, size):
+        with self._lock:
+            self.batch_sizes.append(size)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self.latencies)
+            batch_sizes = np.array(self.batch_sizes)
+            elapsed = time.perf_counter() - self.started
+            return {
+                "requests": self.requests,
+                "throughput_per_s": self.requests / elapsed if elapsed > 0 else 0.0,
+                "p50_ms": float(np.percentile(latencies, 50) * 1000) if len(latencies) else None,
+                "p99_ms": float(np.percentile(latencies, 99) * 1000) if len(latencies) else None,
+                "mean_batch_size": float(batch_sizes.mean()) if len(batch_sizes) else None,
+            }
+
+
+class MicroBatcher:
+    """
+    Collects single rows from many threads and scores them together.
+    predict_fn receives a 2-D array and returns one result per row.
+    """
+
+    def __init__(self, predict_fn, n_features, max_batch=256, max_wait_ms=5.0, stats=None):
+        self.predict_fn = predict_fn
+        self.n_features = n_features
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.stats = stats
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, row):
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def _collect(self):
+        """
+        Blocks for the first row, then gathers more until the batch is full or max_wait has passed.
+        """
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = np.vstack([row for row, _ in batch]).reshape(len(batch), self.n_features)
+            try:
+                results = self.predict_fn(rows)
+            except Exception:
+                # Én dårlig række må ikke fælde de andre kalderes rækker i samme batch
+                self._run_one_by_one(batch, rows)
+                continue
+            if self.stats is not None:
+                self.stats.record_batch(len(batch))
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _run_one_by_one(self, batch, rows):
+        """
+        Scores the rows of a failed batch separately, so only the failing rows get the error.
+        """
+        for (_, future), row in zip(batch, rows):
+            try:
+                result = self.predict_fn(row[None, :])[0]
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+class PredictionService:
+    """
+    Holds the loaded models and one micro-batcher per model.
+    """
+
+    def __init__(self, income_path=INCOME_MODEL_PATH, attrition_path=ATTRITION_MODEL_PATH, max_batch=256, max_wait_ms=5.0):
+        self.stats = LatencyStats()
+        self.income_model = load_model(income_path)
+        self.attrition_model = load_model(attrition_path)
+        # Micro-batches are small, so the compiled tree beats sklearn's per-call overhead
+        self.attrition_tree = compile_tree(self.attrition_model)
+        self.encoders = {"income": load_encoder(income_path), "attrition": load_encoder(attrition_path)}
+
+        self.batchers = {
+            name: MicroBatcher(predict_fn, len(self.encoders[name].columns), max_batch, max_wait_ms, self.stats)
+            for name, predict_fn in [("income", self._predict_income), ("attrition", self._predict_attrition)]
+        }
+
+    def _predict_income(self, rows):
+        predictions = predict(self.income_model, rows)
+        return [{"prediction": float(p)} for p in predictions]
+
+    def _predict_attrition(self, rows):
+        proba = self.attrition_tree.predict_proba(rows)
+        labels = self.attrition_tree.classes[proba.argmax(axis=1)]
+        positive = list(self.attrition_tree.classes).index(1)
+        return [{"prediction": int(label), "probability": float(p[positive])} for label, p in zip(labels, proba)]
+
+    def predict(self, model_name, records):
+        rows = self.encoders[model_name].transform(records)
+        # Tjekkes før submit: NaN fejler sklearn og sendes af det kompilerede træ til højre gren
+        if not np.isfinite(rows).all():
+            raise ValueError("Every feature value must be a finite number")
+        futures = [self.batchers[model_name].submit(row) for row in rows]
+        return [future.result() for future in futures]
+
+
+def parse_records(payload):
+    """
+    Returns the list of input records in a request body, or raises ValueError if it is malformed.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("The request body must be a JSON object with 'instances' or 'features'")
+    if "instances" in payload:
+        records = payload["instances"]
+        if not isinstance(records, list) or not records:
+            raise ValueError("'instances' must be a non-empty list of objects")
+    elif "features" in payload:
+        records = [payload["features"]]
+    else:
+        raise ValueError("The request body must contain 'instances' or 'features'")
+    for record in records:
+        if not isinstance(record, dict) or not record:
+            raise ValueError("Every instance must be a non-empty object of feature values")
+    return records
+
+
+class PredictionHTTPServer(ThreadingHTTPServer):
+    # Standardkøen på 5 forbindelser nulstiller klienter under samtidig belastning
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def make_handler(service):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            elif self.path == "/metrics":
+                self._send_json(200, service.stats.snapshot())
+            else:
+                self._send_json(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            started = time.perf_counter()
+            model_name = self.path.rsplit("/", 1)[-1]
+            if not self.path.startswith("/predict/") or model_name not in service.batchers:
+                self._send_json(404, {"error": f"Unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"null")
+                records = parse_records(payload)
+                results = service.predict(model_name, records)
+            except (ValueError, TypeError, AttributeError, KeyError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            self._send_json(200, {"predictions": results})
+            service.stats.record_request(time.perf_counter() - started)
+
+        def log_message(self, format, *args):
+            # Ingen log pr. request - det ville dominere latenstiden
+            pass
+
+    return PredictionHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the HR income and attrition models over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    service = PredictionService(max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    server = PredictionHTTPServer((args.host, args.port), make_handler(service))
+    print(f"🚀 Prediction server lytter på http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 {service.stats.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Parity of the compiled attrition tree with sklearn on the bundled model and HR data.
+
+    python -m pytest MiniProjectThree/test_tree_compiler.py
+"""
+import os
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from hr_models import ATTRITION_MODEL_PATH, PROJECT_DIR, encode_frame, load_encoder, load_model
+from tree_compiler import PARITY_TOLERANCE, check_generated_parity, check_parity, compile_tree
+
+
+def _model_and_rows():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        clf = load_model(ATTRITION_MODEL_PATH)
+    raw = pd.read_csv(os.path.join(PROJECT_DIR, "data", "WA_Fn-UseC_-HR-Employee-Attrition.csv"))
+    X = encode_frame(raw, load_encoder(ATTRITION_MODEL_PATH)).to_numpy()
+    noisy = X * np.random.default_rng(42).uniform(0.8, 1.2, size=X.shape)
+    return clf, np.vstack([X, noisy])
+
+
+def test_compiled_tree_matches_sklearn():
+    clf, X = _model_and_rows()
+    compiled = compile_tree(clf)
+
+    mismatches, max_diff = check_parity(clf, X, compiled)
+    assert mismatches == 0
+    assert max_diff <= PARITY_TOLERANCE
+    assert check_generated_parity(clf, X, compiled.compile_python()) <= PARITY_TOLERANCE
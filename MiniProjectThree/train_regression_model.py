@@ -1,47 +1,190 @@
 # train_regression_model.py
+"""
+Cross-validated model search for the monthly income model.
 
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score, mean_squared_error
-import joblib
+Every candidate (linear, ridge, random forest and gradient boosting over a small parameter grid)
+is scored with k-fold cross-validation. The (candidate, fold) jobs run in parallel on all cores.
+The fold splits and the standardized fold matrices are computed once and shared by every job.
+The leaderboard (R², MSE, fit/predict times) is printed and saved, and the winner is refitted
+on all rows and saved as models/income_regression_model.pkl.
+
+    python train_regression_model.py
+    python train_regression_model.py --folds 10 --n-jobs 4
+"""
+import argparse
 import os
-from sklearn.ensemble import RandomForestRegressor
-model = RandomForestRegressor(n_estimators=100, random_state=42)
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Repo-roden indeholder de fælles moduler (fx dtype_schema)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dtype_schema import apply_schema
+from hr_models import INCOME_FEATURES, FeatureEncoder, encoder_path
+
+DATA_PATH = "data/attrition_clean.csv"
+MODEL_PATH = "models/income_regression_model.pkl"
+LEADERBOARD_PATH = "models/income_leaderboard.csv"
+TARGET = "MonthlyIncome"
+
+# Kandidatmodeller og deres parametergrid
+CANDIDATES = {
+    "linear": (LinearRegression, {}),
+    "ridge": (Ridge, {"alpha": [0.1, 1.0, 10.0, 100.0]}),
+    "random_forest": (RandomForestRegressor, {
+        "n_estimators": [100, 300],
+        "max_depth": [None, 8],
+        "min_samples_leaf": [1, 5],
+        "random_state": [42],
+    }),
+    "gradient_boosting": (GradientBoostingRegressor, {
+        "n_estimators": [100, 300],
+        "learning_rate": [0.05, 0.1],
+        "max_depth": [2, 3],
+        "random_state": [42],
+    }),
+}
+
+
+def load_training_data(path=DATA_PATH):
+    # Indlæs renset data med kompakte dtypes
+    df = apply_schema(pd.read_csv(path), "hr_clean")
+    X = df[INCOME_FEATURES]
+    y = df[TARGET]
+    return X, y
+
+
+def make_folds(X, y, n_splits=5, random_state=42):
+    """
+    Splits and standardizes the data once. Returns one (X_train, X_test, y_train, y_test) tuple per fold,
+    as contiguous float64 arrays so joblib can memory-map them into the worker processes.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    folds = []
+    for train_idx, test_idx in KFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(X):
+        scaler = StandardScaler().fit(X[train_idx])
+        folds.append((scaler.transform(X[train_idx]), scaler.transform(X[test_idx]), y[train_idx], y[test_idx]))
+    return folds
+
+
+def candidate_grid(candidates=CANDIDATES):
+    """
+    Expands the parameter grids into a flat list of (name, estimator class, params).
+    """
+    return [
+        (name, estimator, params)
+        for name, (estimator, grid) in candidates.items()
+        for params in ParameterGrid(grid)
+    ]
+
+
+def evaluate(candidate, fold_index, fold):
+    """
+    Fits one candidate on one fold and returns its scores and timings.
+    """
+    name, estimator, params = candidate
+    X_train, X_test, y_train, y_test = fold
+    model = estimator(**params)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    return {
+        "model": name,
+        "params": ", ".join(f"{key}={value}" for key, value in params.items()),
+        "fold": fold_index,
+        "r2": r2_score(y_test, y_pred),
+        "mse": mean_squared_error(y_test, y_pred),
+        "fit_s": fit_seconds,
+        "predict_s": predict_seconds,
+    }
+
+
+def search(X, y, grid, n_splits=5, n_jobs=-1):
+    """
+    Cross-validates every candidate in grid in parallel and returns the leaderboard, best model first.
+    The leaderboard index is the candidate's position in grid.
+    """
+    folds = make_folds(X, y, n_splits)
+    jobs = [delayed(evaluate)(candidate, i, fold) for candidate in grid for i, fold in enumerate(folds)]
+    results = pd.DataFrame(Parallel(n_jobs=n_jobs)(jobs))
+    results["candidate"] = np.repeat(np.arange(len(grid)), n_splits)
+
+    # Én række pr. kandidat: gennemsnit over folds
+    leaderboard = results.groupby(["candidate", "model", "params"], sort=False).agg(
+        r2_mean=("r2", "mean"),
+        r2_std=("r2", "std"),
+        mse_mean=("mse", "mean"),
+        fit_s=("fit_s", "mean"),
+        predict_s=("predict_s", "mean"),
+    ).reset_index(["model", "params"])
+    return leaderboard.sort_values("r2_mean", ascending=False)
+
+
+def refit_best(leaderboard, grid, X, y):
+    """
+    Refits the winning candidate on all rows, with the same standardization as in the search.
+    """
+    _, estimator, params = grid[leaderboard.index[0]]
+    model = make_pipeline(StandardScaler(), estimator(**params))
+    return model.fit(X, y)
+
 
-# Indlæs renset data
-df = pd.read_csv("data/attrition_clean.csv")
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated model search for the income model.")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel jobs (-1 = all cores)")
+    parser.add_argument("--output", default=MODEL_PATH)
+    parser.add_argument("--leaderboard", default=LEADERBOARD_PATH)
+    args = parser.parse_args()
 
-# Vælg relevante features
-X = df[[
-    'Age', 'JobLevel', 'TotalWorkingYears', 'YearsAtCompany', 'OverTime',
-    'DistanceFromHome', 'Education', 'PerformanceRating', 'EnvironmentSatisfaction'
-]]
-y = df['MonthlyIncome']
+    X, y = load_training_data()
+    grid = candidate_grid()
 
-# Split i træning/test
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    start = time.perf_counter()
+    leaderboard = search(X, y, grid, n_splits=args.folds, n_jobs=args.n_jobs)
+    print(f"✅ Søgning færdig på {time.perf_counter() - start:.1f}s ({len(leaderboard)} kandidater × {args.folds} folds)")
 
-# Træn model
-model = LinearRegression()
-model.fit(X_train, y_train)
+    print("\n🏆 Leaderboard:")
+    with pd.option_context("display.width", 200, "display.max_colwidth", 80):
+        print(leaderboard.round(4).to_string())
 
-# Evaluer
-y_pred = model.predict(X_test)
-r2 = r2_score(y_test, y_pred)
-mse = mean_squared_error(y_test, y_pred)
+    model = refit_best(leaderboard, grid, X, y)
+    best = leaderboard.iloc[0]
+    print(f"\n📈 Vinder: {best['model']} {best['params']}")
+    print(f"📈 R²-score (CV): {best['r2_mean']:.2f} ± {best['r2_std']:.2f}")
+    print(f"📉 Mean Squared Error (CV): {best['mse_mean']:.2f}")
 
-print(f"✅ Model trænet.")
-print(f"📈 R²-score: {r2:.2f}")
-print(f"📉 Mean Squared Error: {mse:.2f}")
+    # Udskriv modelens koefficienter (kun for lineære modeller, på standardiseret skala)
+    final = model[-1]
+    if hasattr(final, "coef_"):
+        print("\n📊 Feature-koefficienter (standardiseret):")
+        for feature, coef in zip(INCOME_FEATURES, final.coef_):
+            print(f"{feature}: {coef:.2f}")
 
-# Udskriv modelens koefficienter
-print("\n📊 Feature-koefficienter:")
-for feature, coef in zip(X.columns, model.coef_):
-    print(f"{feature}: {coef:.2f}")
+    # Gem model og leaderboard
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    joblib.dump(model, args.output)
+    FeatureEncoder(INCOME_FEATURES).save(encoder_path(args.output))
+    leaderboard.to_csv(args.leaderboard, index=False)
+    print(f"💾 Model gemt i {args.output}, leaderboard i {args.leaderboard}")
 
 
-# Gem model
-os.makedirs("models", exist_ok=True)
-joblib.dump(model, "models/income_regression_model.pkl")
-print("💾 Model gemt i models/income_regression_model.pkl")
+if __name__ == "__main__":
+    main()
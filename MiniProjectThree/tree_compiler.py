@@ -0,0 +1,225 @@
+"""
+Compiles a fitted DecisionTreeClassifier into flat NumPy arrays (and optionally Python source)
+for fast inference without sklearn's per-call validation.
+
+Batches are evaluated level by level: every row advances one node per step, so a depth-5
+tree takes five vectorized gathers over the whole batch. Inputs are cast to float32 before
+comparing, exactly as sklearn does, so the split decisions are identical.
+
+Large batches are still faster through sklearn's Cython traversal; the compiled tree pays off
+for single rows and small micro-batches, where sklearn's per-call overhead dominates.
+
+    python tree_compiler.py            # parity check and timings against sklearn on the HR data
+
+The parity check exits non-zero when any leaf or probability differs from sklearn.
+"""
+import os
+import sys
+import time
+import weakref
+
+import numpy as np
+
+LEAF = -1
+
+# Største tilladte forskel i sandsynlighed mellem det kompilerede træ og sklearn
+PARITY_TOLERANCE = 1e-12
+
+
+class CompiledTree:
+    """
+    A decision tree as parallel node arrays: feature, threshold, left/right child and the
+    class probabilities of every node.
+    """
+
+    def __init__(self, feature, threshold, left, right, proba, classes):
+        self.left = np.asarray(left, dtype=np.intp)
+        is_leaf = self.left == LEAF
+        # Bladene peger på sig selv, så traverseringen kan køre et fast antal niveauer
+        node_ids = np.arange(len(self.left))
+        self.left = np.where(is_leaf, node_ids, self.left)
+        self.right = np.where(is_leaf, node_ids, np.asarray(right, dtype=np.intp))
+        self.feature = np.where(is_leaf, 0, np.asarray(feature, dtype=np.intp))
+        self.threshold = np.where(is_leaf, np.inf, np.asarray(threshold, dtype=np.float64))
+        self.proba = np.asarray(proba, dtype=np.float64)
+        self.classes = np.asarray(classes)
+        self.depth = self._depth(is_leaf)
+
+        # Lister til enkeltrækker - Python-opslag er hurtigere end NumPy-indeksering for én værdi
+        self._is_leaf = is_leaf.tolist()
+        self._lists = (self.feature.tolist(), self.threshold.tolist(), self.left.tolist(), self.right.tolist())
+
+    @classmethod
+    def from_sklearn(cls, clf):
+        tree = clf.tree_
+        value = tree.value[:, 0, :]
+        proba = value / value.sum(axis=1, keepdims=True)
+        return cls(tree.feature, tree.threshold, tree.children_left, tree.children_right, proba, clf.classes_)
+
+    def _depth(self, is_leaf):
+        # Antal niveauer ned til det dybeste blad
+        depth, frontier = 0, np.array([0])
+        while True:
+            internal = frontier[~is_leaf[frontier]]
+            if not len(internal):
+                return depth
+            frontier = np.concatenate([self.left[internal], self.right[internal]])
+            depth += 1
+
+    def apply(self, X):
+        """
+        Returns the leaf index for every row of X.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))
+        node = np.zeros(len(X), dtype=np.intp)
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X):
+        return self.proba[self.apply(X)]
+
+    def predict(self, X):
+        return self.classes[self.proba[self.apply(X)].argmax(axis=1)]
+
+    def apply_one(self, row):
+        """
+        Leaf index for a single 1-D row, walked in plain Python.
+        """
+        feature, threshold, left, right = self._lists
+        values = np.asarray(row, dtype=np.float32).ravel().tolist()
+        node = 0
+        while not self._is_leaf[node]:
+            node = left[node] if values[feature[node]] <= threshold[node] else right[node]
+        return node
+
+    def predict_proba_one(self, row):
+        return self.proba[self.apply_one(row)]
+
+    def to_python(self, name="predict_proba_one"):
+        """
+        Generates the tree as nested if/else Python source. The function takes a sequence of
+        float32-rounded feature values and returns the tuple of class probabilities.
+        """
+        feature, threshold, left, right = self._lists
+        lines = [f"def {name}(x):"]
+
+        def emit(node, indent):
+            pad = "    " * indent
+            if self._is_leaf[node]:
+                lines.append(f"{pad}return {tuple(self.proba[node].tolist())!r}")
+                return
+            lines.append(f"{pad}if x[{feature[node]}] <= {threshold[node]!r}:")
+            emit(left[node], indent + 1)
+            lines.append(f"{pad}else:")
+            emit(right[node], indent + 1)
+
+        emit(0, 1)
+        return "\n".join(lines) + "\n"
+
+    def compile_python(self, name="predict_proba_one"):
+        namespace = {}
+        exec(compile(self.to_python(name), f"<compiled tree {name}>", "exec"), namespace)
+        return namespace[name]
+
+    def save(self, path):
+        """
+        Exports the arrays as an .npz file (children in sklearn form, with -1 for leaves).
+        """
+        is_leaf = np.array(self._is_leaf)
+        np.savez(
+            path,
+            feature=self.feature, threshold=self.threshold, proba=self.proba, classes=self.classes,
+            left=np.where(is_leaf, LEAF, self.left), right=np.where(is_leaf, LEAF, self.right),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["feature"], data["threshold"], data["left"], data["right"], data["proba"], data["classes"])
+
+
+# Én kompileret udgave pr. fittet model, så længe modellen lever
+_compiled = weakref.WeakKeyDictionary()
+
+
+def compile_tree(clf):
+    """
+    Returns the compiled form of clf, compiling it on first use.
+    """
+    compiled = _compiled.get(clf)
+    if compiled is None:
+        compiled = _compiled[clf] = CompiledTree.from_sklearn(clf)
+    return compiled
+
+
+def check_parity(clf, X, compiled=None):
+    """
+    Compares the compiled tree with sklearn on X. Returns the number of rows whose leaf differs
+    and the largest absolute probability difference; both should be 0.
+    """
+    compiled = compiled or compile_tree(clf)
+    X = np.asarray(X, dtype=np.float32)
+    leaf_mismatches = int((compiled.apply(X) != clf.apply(X)).sum())
+    max_diff = float(np.abs(compiled.predict_proba(X) - clf.predict_proba(X)).max())
+    return leaf_mismatches, max_diff
+
+
+def check_generated_parity(clf, X, generated):
+    """
+    Largest absolute probability difference between the generated Python function and sklearn on X.
+    """
+    rows = np.asarray(X, dtype=np.float32)
+    return max(
+        abs(a - b) for row, p in zip(rows.tolist(), clf.predict_proba(rows))
+        for a, b in zip(generated(row), p)
+    )
+
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    import warnings
+    import pandas as pd
+    from hr_models import ATTRITION_MODEL_PATH, encode_frame, load_encoder, load_model
+
+    warnings.filterwarnings("ignore")
+    clf = load_model(ATTRITION_MODEL_PATH)
+    raw = pd.read_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "WA_Fn-UseC_-HR-Employee-Attrition.csv"))
+    X = encode_frame(raw, load_encoder(ATTRITION_MODEL_PATH)).to_numpy()
+
+    compiled = compile_tree(clf)
+    generated = compiled.compile_python()
+
+    # Paritet på de rigtige rækker og på støjede rækker omkring split-tærsklerne
+    rng = np.random.default_rng(42)
+    noisy = X * rng.uniform(0.8, 1.2, size=X.shape)
+    failed = False
+    for label, data in [("HR data", X), ("perturbed", noisy)]:
+        mismatches, max_diff = check_parity(clf, data, compiled)
+        generated_diff = check_generated_parity(clf, data, generated)
+        ok = mismatches == 0 and max_diff <= PARITY_TOLERANCE and generated_diff <= PARITY_TOLERANCE
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {label}: {mismatches} leaf mismatches, max |Δp| arrays {max_diff:.2e}, generated {generated_diff:.2e}")
+    if failed:
+        sys.exit(f"❌ The compiled tree differs from sklearn (tolerance {PARITY_TOLERANCE:g})")
+
+    big = np.tile(X, (100, 1))
+    row = X[:1]
+    row_values = np.asarray(row[0], dtype=np.float32).tolist()
+    print(f"⏱️ Single row: sklearn {_time(lambda: clf.predict_proba(row), 200) * 1e6:.0f} µs, "
+          f"arrays {_time(lambda: compiled.predict_proba_one(row[0]), 2000) * 1e6:.1f} µs, "
+          f"generated {_time(lambda: generated(row_values), 2000) * 1e6:.1f} µs")
+    print(f"⏱️ Batch of {len(big):,}: sklearn {_time(lambda: clf.predict_proba(big), 5) * 1e3:.1f} ms, "
+          f"arrays {_time(lambda: compiled.predict_proba(big), 5) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,84 @@
+import os
+import sys
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Load data
-@st.cache_data
+# Make the project folder importable when the page is started directly
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
+
+from wine_data import RED_WINE_PATH, WHITE_WINE_PATH, load_wine_workbook
+from dtype_schema import apply_schema
+from figure_cache import get_figure_cache
+from correlation_service import get_correlation_service
+from quantile_sketch import build_sketches, iqr_fences, outlier_mask
+from shared_store import get_shared_store, source_version
+
+# Load data once per server process; every session gets a read-only view of the shared copy
 def load_data():
-    df_red = pd.read_excel("winequality-red.xlsx", header=1)
-    df_white = pd.read_excel("winequality-white.xlsx", header=1)
-    df_red["type"] = "red"
-    df_white["type"] = "white"
-    df_combined = pd.concat([df_red, df_white], ignore_index=True)
+    store = get_shared_store()
+    version = source_version(RED_WINE_PATH, WHITE_WINE_PATH)
+    df_red = store.frame("michella-red", lambda: load_wine_workbook(RED_WINE_PATH).assign(type="red"), version)
+    df_white = store.frame("michella-white", lambda: load_wine_workbook(WHITE_WINE_PATH).assign(type="white"), version)
+    combine = lambda: apply_schema(pd.concat([df_red, df_white], ignore_index=True), "wine")
+    df_combined = store.frame("michella-wine", combine, version)
     return df_red, df_white, df_combined
 
 df_red, df_white, df_combined = load_data()
 
+
+# Versionen af kildefilerne (størrelse/mtime + skema), så der ikke hashes hele datasættet ved hver rerun
+data_version = source_version(RED_WINE_PATH, WHITE_WINE_PATH)
+
+
+@st.cache_data
+def load_iqr_fences(_df, version, chunk_size=100_000):
+    # One streaming pass over the data: a quantile sketch per column and wine type.
+    # _df is left out of Streamlit's hash; the cache is keyed on the data version instead
+    chunks = (_df.iloc[start:start + chunk_size] for start in range(0, len(_df), chunk_size))
+    return iqr_fences(build_sketches(chunks, group_col="type"))
+
+
+def show_figure(section, name, draw):
+    # Render once per (section, figure, data version); repeat views reuse the cached PNG bytes
+    key = get_figure_cache().make_key("Michella", section, data_version, figure=name)
+    st.image(get_figure_cache().render(key, draw))
+
+
+def alcohol_histogram(df, title):
+    fig, ax = plt.subplots()
+    ax.hist(df['alcohol'], bins=30)
+    ax.set_title(title)
+    return fig
+
+
+def histogram_by_type(column, title):
+    fig, ax = plt.subplots()
+    for wine_type in ["red", "white"]:
+        subset = df_combined[df_combined["type"] == wine_type]
+        ax.hist(subset[column], bins=30, alpha=0.5, label=wine_type)
+    ax.legend()
+    ax.set_title(title)
+    return fig
+
+
+def quality_boxplot():
+    fig, ax = plt.subplots()
+    sns.boxplot(data=df_combined, x="type", y="quality", ax=ax)
+    ax.set_title("Wine Quality Comparison")
+    return fig
+
+
+def scatter_vs_quality(column, title):
+    fig, ax = plt.subplots()
+    sns.scatterplot(data=df_combined, x=column, y="quality", hue="type", ax=ax)
+    ax.set_title(title)
+    return fig
+
+
 # Sidebar navigation
 st.sidebar.title("Mini Project 2 Navigation")
 section = st.sidebar.radio("Go to:", [
@@ -28,10 +92,7 @@ if section == "Task 6 – Descriptive Statistics":
     st.title("Task 6: Descriptive Statistics and Normal Distribution Check")
 
     st.subheader("Red Wine – Alcohol Distribution")
-    fig, ax = plt.subplots()
-    ax.hist(df_red['alcohol'], bins=30)
-    ax.set_title('Alcohol Distribution (Red Wine)')
-    st.pyplot(fig)
+    show_figure("Task 6", "red_alcohol", lambda: alcohol_histogram(df_red, 'Alcohol Distribution (Red Wine)'))
 
     st.markdown("""
 **Observation:**  
@@ -39,10 +100,7 @@ The distribution of alcohol content is not normal. This is clearly visible in th
 """)
 
     st.subheader("White Wine – Alcohol Distribution")
-    fig, ax = plt.subplots()
-    ax.hist(df_white['alcohol'], bins=30)
-    ax.set_title('Alcohol Distribution (White Wine)')
-    st.pyplot(fig)
+    show_figure("Task 6", "white_alcohol", lambda: alcohol_histogram(df_white, 'Alcohol Distribution (White Wine)'))
 
     st.markdown("""**Observation:**
             The distribution of alcohol content in white wines is also not normal. Although it appears somewhat less skewed than the red wine distribution, it still shows a right-skewed shape with most wines clustered between 9% and 11% alcohol. The distribution is not perfectly symmetrical and does not follow the typical bell-shaped curve of a normal distribution.
@@ -57,10 +115,7 @@ The distribution of alcohol content is not normal. This is clearly visible in th
 elif section == "Task 7 – Visual Comparison":
     st.title("Task 7: Comparison Between Red and White Wines")
 
-    fig, ax = plt.subplots()
-    sns.boxplot(data=df_combined, x="type", y="quality", ax=ax)
-    ax.set_title("Wine Quality Comparison")
-    st.pyplot(fig)
+    show_figure("Task 7", "quality_boxplot", quality_boxplot)
 
     st.markdown("**7b - The boxplot shows the distribution of wine quality ratings for red and white wines. The median quality is almost identical for both types, around 6. However, white wines have slightly more high outliers, indicating that there may be more high-quality white wines in the dataset. Overall, the average difference in quality between red and white wines is minimal.**")
 
@@ -72,55 +127,39 @@ elif section == "Task 7 – Visual Comparison":
     st.write(df_white["quality"].quantile([0.25, 0.5, 0.75]))
     st.markdown("**The median quality is 6, which is the same as the third quartile. Because the median and Q3 have the same value, the horizontal line representing the median is visually merged with the top edge of the box in the boxplot, and therefore not visible as a separate line.**")
 
-    fig, ax = plt.subplots()
-    for wine_type in ["red", "white"]:
-        subset = df_combined[df_combined["type"] == wine_type]
-        ax.hist(subset["alcohol"], bins=30, alpha=0.5, label=wine_type)
-    ax.legend()
-    ax.set_title("Alcohol Content by Wine Type")
-    st.pyplot(fig)
+    show_figure("Task 7", "alcohol_by_type", lambda: histogram_by_type("alcohol", "Alcohol Content by Wine Type"))
     st.markdown("**7c - The histogram shows that white wines generally have a higher average alcohol content than red wines. Although both wine types have most samples clustered between 9% and 12%, white wine has a broader distribution and more samples with alcohol levels above 12%. This suggests that white wines in this dataset tend to have slightly higher alcohol content on average.**")
 
 
-    fig, ax = plt.subplots()
-    for wine_type in ["red", "white"]:
-        subset = df_combined[df_combined["type"] == wine_type]
-        ax.hist(subset["residual sugar"], bins=30, alpha=0.5, label=wine_type)
-    ax.legend()
-    ax.set_title("Residual Sugar by Wine Type")
-    st.pyplot(fig)
+    show_figure("Task 7", "sugar_by_type", lambda: histogram_by_type("residual sugar", "Residual Sugar by Wine Type"))
     st.markdown("**7d - The average residual sugar content is clearly higher in white wine than in red wine. This is confirmed both by the descriptive statistics and by the visualizations. While red wines typically have low sugar content around 2–3 g/dm³, white wines show a broader range and often exceed 6 g/dm³. This reflects the common winemaking practice of allowing more residual sugar in white wines to balance acidity and flavor.**")
 
 
-    fig, ax = plt.subplots()
-    sns.scatterplot(data=df_combined, x="alcohol", y="quality", hue="type", ax=ax)
-    ax.set_title("Alcohol vs Quality")
-    st.pyplot(fig)
-
-    fig, ax = plt.subplots()
-    sns.scatterplot(data=df_combined, x="residual sugar", y="quality", hue="type", ax=ax)
-    ax.set_title("Residual Sugar vs Quality")
-    st.pyplot(fig)
+    show_figure("Task 7", "alcohol_vs_quality", lambda: scatter_vs_quality("alcohol", "Alcohol vs Quality"))
+    show_figure("Task 7", "sugar_vs_quality", lambda: scatter_vs_quality("residual sugar", "Residual Sugar vs Quality"))
     st.markdown("**The scatter plot and correlation analysis show that alcohol content has a positive correlation with wine quality. This means that, generally, wines with higher alcohol levels tend to be rated higher in quality. On the other hand, residual sugar does not show a clear relationship with wine quality. The correlation is very weak, and the scatter plot shows no clear pattern. In conclusion, alcohol content appears to influence quality more than sugar does – especially in red wines.**")
 
 
 elif section == "Task 11 – Outliers":
     st.title("Task 11: Outlier Detection in Residual Sugar")
 
-    Q1 = df_combined["residual sugar"].quantile(0.25)
-    Q3 = df_combined["residual sugar"].quantile(0.75)
-    IQR = Q3 - Q1
-    lower = Q1 - 1.5 * IQR
-    upper = Q3 + 1.5 * IQR
+    fences = load_iqr_fences(df_combined, data_version)
+    is_outlier = outlier_mask(df_combined, fences, columns=["residual sugar"])["residual sugar"].to_numpy()
 
-    outliers = df_combined[(df_combined["residual sugar"] < lower) | (df_combined["residual sugar"] > upper)]
+    outliers = df_combined[is_outlier]
     st.write(f"Number of outliers: {len(outliers)}")
     st.write("First 5 outlier rows:")
     st.write(outliers.head())
 
-    df_cleaned = df_combined.drop(outliers.index)
+    df_cleaned = df_combined[~is_outlier]
     st.write(f"New dataset shape: {df_cleaned.shape}")
 
+    st.subheader("IQR fences for every numeric column per wine type")
+    st.dataframe(fences)
+    by_type = outlier_mask(df_combined, fences, group_col="type")
+    st.write("Outliers per column (using each wine type's own fences):")
+    st.dataframe(by_type.groupby(df_combined["type"]).sum())
+
     st.markdown("""
 **Explanation – Outlier Removal in 'Residual Sugar':**  
 To improve data quality, we analyzed the `residual sugar` feature for outliers using the IQR (Interquartile Range) method.  
@@ -137,7 +176,8 @@ elif section == "Task 12 – Correlation Filtering":
     st.title("Task 12: Remove Weak or Redundant Features")
 
     df_cleaned = df_combined.copy()
-    corr_matrix = df_cleaned.corr(numeric_only=True)
+    correlations = get_correlation_service().ensure("Michella/wine", df_combined, version=data_version)
+    corr_matrix = correlations.matrix("Michella/wine")
     st.dataframe(corr_matrix.round(2))
 
     columns_to_drop = ["density", "free sulfur dioxide", "citric acid"]
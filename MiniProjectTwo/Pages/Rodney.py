@@ -1,37 +1,49 @@
 import pandas as pd
 import os
+import sys
 import streamlit as st
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
 
 
 # Find den aktuelle mappe
-current_dir = os.path.dirname(os.path.dirname(__file__))
+current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
 
-# Definér stier til Excel-filerne
-red_wine_path = os.path.join(current_dir, "winequality-red.xlsx")
-white_wine_path = os.path.join(current_dir, "winequality-white.xlsx")
+from wine_data import RED_WINE_PATH, WHITE_WINE_PATH, load_wine_frames
+from pca_service import PCAService
+from dtype_schema import apply_schema
 
-# Læs Excel-filerne (husk header=1 hvis kolonnenavne starter i række 2)
-red_wine = pd.read_excel(red_wine_path, header=1)
-white_wine = pd.read_excel(white_wine_path, header=1)
+combined_csv_path = os.path.join(current_dir, "combined_wine_data.csv")
 
-# Tilføj 'wine_type' kolonne for at identificere typen
-red_wine['wine_type'] = 'red'
-white_wine['wine_type'] = 'white'
 
-# Saml de to DataFrames til ét samlet DataFrame
-combined_wine = pd.concat([red_wine, white_wine], ignore_index=True)
+@st.cache_data
+def load_wine_data():
+    # Læs Excel-filerne via den fælles cache (kolonnenavne starter i række 2)
+    red_wine, white_wine = load_wine_frames()
 
-# Print de første 10 rækker af det samlede datasæt
-print(combined_wine.head(10))
+    # Tilføj 'wine_type' kolonne for at identificere typen
+    red_wine['wine_type'] = 'red'
+    white_wine['wine_type'] = 'white'
 
-# Vis form (antal rækker og kolonner)
-print("\nSamlet datasæt størrelse:", combined_wine.shape)
+    # Saml de to DataFrames til ét samlet DataFrame
+    combined_wine = apply_schema(pd.concat([red_wine, white_wine], ignore_index=True), "wine")
 
-# Gem det samlede datasæt som CSV (valgfrit)
-combined_wine.to_csv(os.path.join(current_dir, "combined_wine_data.csv"), index=False)
-print("\n✅ Data gemt som 'combined_wine_data.csv'")
+    # Gem det samlede datasæt som CSV, men kun når Excel-filerne er nyere end den gemte fil
+    newest_source = max(os.path.getmtime(RED_WINE_PATH), os.path.getmtime(WHITE_WINE_PATH))
+    if not os.path.exists(combined_csv_path) or os.path.getmtime(combined_csv_path) < newest_source:
+        combined_wine.to_csv(combined_csv_path, index=False)
+        print("\n✅ Data gemt som 'combined_wine_data.csv'")
+
+    return red_wine, white_wine, combined_wine
+
+
+@st.cache_resource
+def get_pca_service():
+    # Én service pr. serverproces - den fittede PCA genbruges på tværs af reruns
+    return PCAService(n_components=2)
+
+
+red_wine, white_wine, combined_wine = load_wine_data()
 
 # Sidebar navigation
 st.sidebar.title("Mini Project 2 Navigation")
@@ -44,95 +56,59 @@ section = st.sidebar.radio("Go to:", [
 if section == "Task 4 – Descriptive Statistics":
     st.title("Task 4: Explore the features of the three data frames separately. Identify the dependent and the independent variables")
 
-# Tilføj 'wine_type'
-red_wine['wine_type'] = 'red'
-white_wine['wine_type'] = 'white'
-
-# Saml data
-combined_wine = pd.concat([red_wine, white_wine], ignore_index=True)
+    # 🔍 Udforsk de tre datasæt hver for sig
+    print("🔴 Red Wine Info:")
+    print(red_wine.info())
+    print("\n📊 Red Wine Stats:")
+    print(red_wine.describe())
 
-# 🔍 Udforsk de tre datasæt hver for sig
-print("🔴 Red Wine Info:")
-print(red_wine.info())
-print("\n📊 Red Wine Stats:")
-print(red_wine.describe())
+    print("\n⚪ White Wine Info:")
+    print(white_wine.info())
+    print("\n📊 White Wine Stats:")
+    print(white_wine.describe())
 
-print("\n⚪ White Wine Info:")
-print(white_wine.info())
-print("\n📊 White Wine Stats:")
-print(white_wine.describe())
+    print("\n🍷 Combined Wine Info:")
+    print(combined_wine.info())
+    print("\n📊 Combined Wine Stats:")
+    print(combined_wine.describe())
 
-print("\n🍷 Combined Wine Info:")
-print(combined_wine.info())
-print("\n📊 Combined Wine Stats:")
-print(combined_wine.describe())
+    # 🎯 Identificer afhængige og uafhængige variable
+    dependent_var = 'quality'
+    independent_vars = [col for col in combined_wine.columns if col != 'quality']
 
-# 🎯 Identificer afhængige og uafhængige variable
-dependent_var = 'quality'
-independent_vars = [col for col in combined_wine.columns if col != 'quality']
+    print("\n🎯 Dependent Variable:", dependent_var)
+    print("📊 Independent Variables:", independent_vars)
 
-print("\n🎯 Dependent Variable:", dependent_var)
-print("📊 Independent Variables:", independent_vars)
+# 🔁 Transformér kategorisk data til numerisk (på en kopi, så den cachede data ikke ændres)
+encoded_wine = combined_wine.copy()
+encoded_wine['wine_type_encoded'] = encoded_wine['wine_type'].map({'red': 0, 'white': 1}).astype('int8')
 
 if section == "Task 5 – Encode Categorical Data":
     st.title("Task 5: Transform the categorical data into numeric, applying appropriate encoding methods.")
 
-# 🔍 Udforsk de tre datasæt hver for sig
-print("🔴 Red Wine Info:")
-print(red_wine.info())
-print("\n📊 Red Wine Stats:")
-print(red_wine.describe())
-
-print("\n⚪ White Wine Info:")
-print(white_wine.info())
-print("\n📊 White Wine Stats:")
-print(white_wine.describe())
-
-print("\n🍷 Combined Wine Info:")
-print(combined_wine.info())
-print("\n📊 Combined Wine Stats:")
-print(combined_wine.describe())
-
-# 🎯 Identificer afhængige og uafhængige variable
-dependent_var = 'quality'
-independent_vars = [col for col in combined_wine.columns if col != 'quality']
-
-print("\n🎯 Dependent Variable:", dependent_var)
-print("📊 Independent Variables:", independent_vars)
+    # Bekræft encoding
+    print("\n🔢 Encoded 'wine_type':")
+    print(encoded_wine[['wine_type', 'wine_type_encoded']].drop_duplicates())
 
 if section == "Task 13 & 14 –  Apply PCA and Show Sample Rows":
     st.title("Task 13 & 14: Transform the data by applying PCA (Principle Component Analysis) & Print out ten random rows from the final dataset as a prove of concept.  encoding methods.")
 
-# 🔁 Transformér kategorisk data til numerisk
-combined_wine['wine_type_encoded'] = combined_wine['wine_type'].map({'red': 0, 'white': 1})
-
-# Bekræft encoding
-print("\n🔢 Encoded 'wine_type':")
-print(combined_wine[['wine_type', 'wine_type_encoded']].drop_duplicates())
-
-# Encode categorical column
-combined_wine['wine_type_encoded'] = combined_wine['wine_type'].map({'red': 0, 'white': 1})
-
-# === Task 13: Apply PCA ===
-
-# Drop non-numeric (non-feature) columns
-features = combined_wine.drop(columns=['wine_type'])
+    # === Task 13: Apply PCA ===
 
-# Separate out features and standardize
-scaler = StandardScaler()
-scaled_features = scaler.fit_transform(features)
+    # Drop non-numeric (non-feature) columns
+    features = encoded_wine.drop(columns=['wine_type'])
 
-# Apply PCA (reduce to 2 components for simplicity)
-pca = PCA(n_components=2)
-pca_result = pca.fit_transform(scaled_features)
+    # Standardize + PCA (2 components) - refitted only when the data changes
+    pca_result = get_pca_service().fit_transform(features).coordinates
 
-# Create a DataFrame with PCA results
-pca_df = pd.DataFrame(data=pca_result, columns=['PC1', 'PC2'])
+    # Create a DataFrame with PCA results
+    pca_df = pd.DataFrame(data=pca_result, columns=['PC1', 'PC2'])
 
-# Optionally, add wine_type or quality for analysis/plotting
-pca_df['wine_type'] = combined_wine['wine_type']
-pca_df['quality'] = combined_wine['quality']
+    # Optionally, add wine_type or quality for analysis/plotting
+    pca_df['wine_type'] = encoded_wine['wine_type']
+    pca_df['quality'] = encoded_wine['quality']
 
-# === Task 14: Print 10 random rows ===
-print("\n🎲 10 Random Rows from PCA Result:")
-print(pca_df.sample(10))
\ No newline at end of file
+    # === Task 14: Print 10 random rows ===
+    print("\n🎲 10 Random Rows from PCA Result:")
+    print(pca_df.sample(10))
+    st.dataframe(pca_df.sample(10))
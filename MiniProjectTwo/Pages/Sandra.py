@@ -1,16 +1,28 @@
+import os
+import sys
 import pandas as pd
 import streamlit as st
 import seaborn as sns
 import matplotlib.pyplot as plt
 
+# Projektmappen skal kunne importeres, også når siden startes direkte
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
+
+from wine_data import RED_WINE_PATH, WHITE_WINE_PATH, load_wine_frames
+from dtype_schema import apply_schema
+from figure_cache import get_figure_cache
+from correlation_service import get_correlation_service
+from shared_store import source_version
+
 
 # Vis alle kolonner i terminalen
 pd.set_option('display.max_columns', None)
 
 def load_and_clean_wine_data():
     try:
-        red_df = pd.read_excel("winequality-red.xlsx", header=1)
-        white_df = pd.read_excel("winequality-white.xlsx", header=1)
+        red_df, white_df = load_wine_frames()
 
         red_df["wine_type"] = "red"
         white_df["wine_type"] = "white"
@@ -32,17 +44,25 @@ def show_correlation_heatmap(df):
     st.write("Herunder ser du en heatmap over korrelationerne mellem alle numeriske attributter.")
 
     # Fjerner ikke-numeriske kolonner
-    numeric_df = df.select_dtypes(include=['float64', 'int64'])
+    numeric_df = df.select_dtypes(include='number')
+
+    # Henter korrelationen fra den fælles service (beregnes kun når data ændrer sig)
+    # Data afhænger kun af kildefilerne, så deres version (størrelse/mtime) bruges i stedet for at hashe data
+    data_version = source_version(RED_WINE_PATH, WHITE_WINE_PATH)
+    correlations = get_correlation_service().ensure("Sandra/wine", numeric_df, version=data_version)
+    corr = correlations.matrix("Sandra/wine")
 
-    # Beregner korrelation
-    corr = numeric_df.corr()
+    # Laver heatmap - renderes kun én gang pr. datasæt, derefter genbruges billedet
+    def draw_heatmap():
+        fig, ax = plt.subplots(figsize=(10, 8))
+        sns.heatmap(corr, annot=True, fmt=".2f", cmap="coolwarm", ax=ax)
+        return fig
 
-    # Laver heatmap
-    fig, ax = plt.subplots(figsize=(10, 8))
-    sns.heatmap(corr, annot=True, fmt=".2f", cmap="coolwarm", ax=ax)
-    st.pyplot(fig)
+    cache = get_figure_cache()
+    key = cache.make_key("Sandra", "correlation_heatmap", data_version)
+    st.image(cache.render(key, draw_heatmap))
 
-    quality_corr = corr["quality"].sort_values(ascending=False)
+    quality_corr = correlations.column("Sandra/wine", "quality").sort_values(ascending=False)
     st.subheader("Attributter mest korreleret med kvalitet:")
     st.write(quality_corr)
 
@@ -52,7 +72,7 @@ def main():
     red_df, white_df = load_and_clean_wine_data()
     if red_df is not None and white_df is not None:
         # Kombiner data
-        combined_df = pd.concat([red_df, white_df], ignore_index=True)
+        combined_df = apply_schema(pd.concat([red_df, white_df], ignore_index=True), "wine")
 
         st.success("✅ Data indlæst og kombineret!")
         st.dataframe(combined_df)
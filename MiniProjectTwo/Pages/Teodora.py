@@ -1,48 +1,95 @@
+import os
+import sys
 import pandas as pd
 import streamlit as st
-import plotly.express as px
+
+# Make the project folder importable when the page is started directly
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.append(PROJECT_DIR)
+
+from wine_data import RED_WINE_PATH, WHITE_WINE_PATH, load_wine_workbook
+from dtype_schema import apply_schema
+from quality_cube import QualityCube
+from histogram_engine import HistogramEngine
+from figure_cache import frame_version
+from correlation_service import get_correlation_service
+from scatter_sampling import DEFAULT_MAX_POINTS, DEFAULT_MAX_ROWS, density_scatter, preview_rows
+from shared_store import get_shared_store, source_version
+
+# Features explored against quality; the quality cube aggregates exactly these
+QUALITY_FACTORS = ['ph', 'alcohol', 'volatile_acidity']
 
 # Class for handling wine data analysis
 class WineAnalysis:
-    def __init__(self, red_path, white_path):
+    def __init__(self, red_path, white_path, max_points=DEFAULT_MAX_POINTS, max_rows=DEFAULT_MAX_ROWS):
         """
         loading red and white wine data, cleaning, and combining them.
+        Scatter plots above max_points rows are aggregated on the server and tables above
+        max_rows rows are sampled, so the browser payload stays bounded.
         """
         self.red_path = red_path
         self.white_path = white_path
+        self.max_points = max_points
+        self.max_rows = max_rows
         
-        # Load data
-        self.df_red = pd.read_excel(self.red_path, skiprows=1)
-        self.df_white = pd.read_excel(self.white_path, skiprows=1)
-        
-        # Clean column names and merge datasets
-        self.df_red.columns = self.df_red.columns.str.strip().str.replace(' ', '_').str.lower()
-        self.df_white.columns = self.df_white.columns.str.strip().str.replace(' ', '_').str.lower()
-        
-        # Add wine type column to differentiate red and white wines
-        self.df_red['wine_type'] = 'red'
-        self.df_white['wine_type'] = 'white'
+        # Load data once per server process; every session gets a read-only view of the shared copy
+        store = get_shared_store()
+        version = source_version(self.red_path, self.white_path)
+        self.df_red = store.frame("teodora-red", lambda: self._load_wine(self.red_path, 'red'), version)
+        self.df_white = store.frame("teodora-white", lambda: self._load_wine(self.white_path, 'white'), version)
         
         # Combine the datasets
-        self.df = pd.concat([self.df_red, self.df_white], ignore_index=True)
+        combine = lambda: apply_schema(pd.concat([self.df_red, self.df_white], ignore_index=True), "wine")
+        self.df = store.frame("teodora-wine", combine, version)
+        self._quality_cube = None
+        self._histograms = None
+        self._data_version = None
+
+    @staticmethod
+    def _load_wine(path, wine_type):
+        """
+        Loads one workbook (served from the columnar cache after the first parse),
+        cleans the column names and adds the wine type column.
+        """
+        df = load_wine_workbook(path)
+        df.columns = df.columns.str.strip().str.replace(' ', '_').str.lower()
+        df['wine_type'] = wine_type
+        return df
+
+    @property
+    def quality_cube(self):
+        """
+        Quality aggregates per wine type and explored feature value, built on first use with one groupby.
+        Every explore_* method reads its optimal values from here instead of grouping self.df.
+        """
+        if self._quality_cube is None:
+            self._quality_cube = QualityCube(self.df, group_col='wine_type', target='quality', features=QUALITY_FACTORS)
+        return self._quality_cube
+
+    @property
+    def histograms(self):
+        """
+        Histogram engine over the numeric columns, answering any bin count without re-binning.
+        """
+        if self._histograms is None:
+            self._histograms = HistogramEngine(self.df)
+        return self._histograms
     
     # ---- Data Binning ----
     def binning_ph(self, bins=5):
         """
-        Bins the pH values into specified categories for further analysis.
+        Returns the pH bin of every row for the given number of bins, without modifying self.df.
         """
         if 'ph' in self.df.columns:
-            self.df['ph_bin'] = pd.cut(self.df['ph'], bins=bins)
+            return pd.cut(self.df['ph'], bins=self.histograms.edges('ph', bins))
 
     def pH_density_subset(self, bins=5):
         """
         Displays the pH density distribution and identifies the pH bin with the highest density.
         """
-        if 'ph_bin' not in self.df.columns:
-            self.binning_ph(bins)
-        
-        # Calculate the density for each pH bin
-        density = self.df.groupby('ph_bin').size() / len(self.df)
+        # Calculate the density for each pH bin from the sorted pH values
+        density = self.histograms.density('ph', bins)
         
         # Identify the bin with the highest density
         highest_density_bin = density.idxmax()
@@ -52,6 +99,36 @@ class WineAnalysis:
         st.write(f"The pH bin with the highest density (using {bins} bins) is **{highest_density_bin}** with a density of **{highest_density_value:.4f}**")
         st.dataframe(density.reset_index(name='density'))
     
+    def _correlation(self, columns):
+        """
+        Returns the correlation matrix of the given columns from the shared correlation service.
+        """
+        if self._data_version is None:
+            self._data_version = frame_version(self.df)
+        service = get_correlation_service().ensure("Teodora/wine", self.df, version=self._data_version)
+        return service.matrix("Teodora/wine", columns=columns)
+
+    # ---- Rendering helpers ----
+    def _show_rows(self, columns):
+        """
+        Displays the selected columns, sampled down to max_rows for large datasets.
+        """
+        rows = preview_rows(self.df, columns, max_rows=self.max_rows)
+        if len(rows) < len(self.df):
+            st.caption(f"Showing a random sample of {len(rows):,} of {len(self.df):,} rows.")
+        st.dataframe(rows)
+
+    def _show_scatter(self, x, title):
+        """
+        Displays a feature vs quality scatter plot, density-binned above max_points rows.
+        """
+        fig, aggregated = density_scatter(self.df, x=x, y='quality', color='wine_type', title=title, max_points=self.max_points)
+        if aggregated:
+            st.caption(f"{len(self.df):,} rows aggregated into density bins; marker size shows the number of wines.")
+        else:
+            fig.update_traces(marker=dict(size=10, opacity=0.7, line=dict(width=0.5, color='black')))
+        st.plotly_chart(fig)
+
     # ---- Wine Quality Analysis ----
     def explore_quality_factors(self):
         """
@@ -62,31 +139,32 @@ class WineAnalysis:
         st.write("## pH vs Quality")
         
         # Display data
-        st.dataframe(self.df[['ph', 'quality', 'wine_type']])
+        self._show_rows(['ph', 'quality', 'wine_type'])
         
         # Display correlation between pH and Quality
-        pH_corr = self.df[['ph', 'quality']].corr()
+        pH_corr = self._correlation(['ph', 'quality'])
         st.write(pH_corr)
         
         # pH vs Quality Scatter Plot
-        fig1 = px.scatter(self.df, x='ph', y='quality', color='wine_type', title="pH vs Quality")
-        fig1.update_traces(marker=dict(size=10, opacity=0.7, line=dict(width=0.5, color='black')))
-        st.plotly_chart(fig1)
+        self._show_scatter('ph', "pH vs Quality")
         
         # Optimal pH for red and white wines
         self._optimal_ph_for_quality()
 
+    def _optimal_for_quality(self, feature, label, unit=""):
+        """
+        Displays the value of a feature with the highest average quality for red and white wines,
+        looked up in the precomputed quality cube.
+        """
+        for wine_type in ["red", "white"]:
+            best = self.quality_cube.best(feature, wine_type)
+            st.write(f"The optimal {label} for {wine_type} wine with the highest quality is **{best['value']:.2f}**{unit} with an average quality score of **{best['mean']:.2f}**.")
+
     def _optimal_ph_for_quality(self):
         """
         Identifies and displays the optimal pH levels for red and white wines for the highest quality.
         """
-        optimal_ph_red = self.df[self.df['wine_type'] == 'red'].groupby('ph').agg({'quality': 'mean'}).reset_index()
-        optimal_ph_red = optimal_ph_red.sort_values('quality', ascending=False).iloc[0]
-        st.write(f"The optimal pH level for red wine with the highest quality is **{optimal_ph_red['ph']:.2f}** with an average quality score of **{optimal_ph_red['quality']:.2f}**.")
-        
-        optimal_ph_white = self.df[self.df['wine_type'] == 'white'].groupby('ph').agg({'quality': 'mean'}).reset_index()
-        optimal_ph_white = optimal_ph_white.sort_values('quality', ascending=False).iloc[0]
-        st.write(f"The optimal pH level for white wine with the highest quality is **{optimal_ph_white['ph']:.2f}** with an average quality score of **{optimal_ph_white['quality']:.2f}**.")
+        self._optimal_for_quality('ph', "pH level")
 
     def explore_alcohol_quality(self):
         """
@@ -97,16 +175,14 @@ class WineAnalysis:
         st.write("## Alcohol vs Quality")
         
         # Display data
-        st.dataframe(self.df[['alcohol', 'quality', 'wine_type']])
+        self._show_rows(['alcohol', 'quality', 'wine_type'])
         
         # Display correlation between Alcohol and Quality
-        alcohol_corr = self.df[['alcohol', 'quality']].corr()
+        alcohol_corr = self._correlation(['alcohol', 'quality'])
         st.write(alcohol_corr)
         
         # Alcohol vs Quality Scatter Plot
-        fig2 = px.scatter(self.df, x='alcohol', y='quality', color='wine_type', title="Alcohol vs Quality")
-        fig2.update_traces(marker=dict(size=10, opacity=0.7, line=dict(width=0.5, color='black')))
-        st.plotly_chart(fig2)
+        self._show_scatter('alcohol', "Alcohol vs Quality")
         
         # Optimal Alcohol content for red and white wines
         self._optimal_alcohol_for_quality()
@@ -115,13 +191,7 @@ class WineAnalysis:
         """
         Identifies and displays the optimal alcohol content for red and white wines for the highest quality.
         """
-        optimal_alcohol_red = self.df[self.df['wine_type'] == 'red'].groupby('alcohol').agg({'quality': 'mean'}).reset_index()
-        optimal_alcohol_red = optimal_alcohol_red.sort_values('quality', ascending=False).iloc[0]
-        st.write(f"The optimal alcohol content for red wine with the highest quality is **{optimal_alcohol_red['alcohol']:.2f}**% with an average quality score of **{optimal_alcohol_red['quality']:.2f}**.")
-        
-        optimal_alcohol_white = self.df[self.df['wine_type'] == 'white'].groupby('alcohol').agg({'quality': 'mean'}).reset_index()
-        optimal_alcohol_white = optimal_alcohol_white.sort_values('quality', ascending=False).iloc[0]
-        st.write(f"The optimal alcohol content for white wine with the highest quality is **{optimal_alcohol_white['alcohol']:.2f}**% with an average quality score of **{optimal_alcohol_white['quality']:.2f}**.")
+        self._optimal_for_quality('alcohol', "alcohol content", unit="%")
 
     def explore_volatile_acidity_quality(self):
         """
@@ -132,16 +202,14 @@ class WineAnalysis:
         st.write("## Volatile Acidity vs Quality")
         
         # Display data
-        st.dataframe(self.df[['volatile_acidity', 'quality', 'wine_type']])
+        self._show_rows(['volatile_acidity', 'quality', 'wine_type'])
         
         # Display correlation between Volatile Acidity and Quality
-        volatile_acidity_corr = self.df[['volatile_acidity', 'quality']].corr()
+        volatile_acidity_corr = self._correlation(['volatile_acidity', 'quality'])
         st.write(volatile_acidity_corr)
         
         # Volatile Acidity vs Quality Scatter Plot
-        fig3 = px.scatter(self.df, x='volatile_acidity', y='quality', color='wine_type', title="Volatile Acidity vs Quality")
-        fig3.update_traces(marker=dict(size=10, opacity=0.7, line=dict(width=0.5, color='black')))
-        st.plotly_chart(fig3)
+        self._show_scatter('volatile_acidity', "Volatile Acidity vs Quality")
         
         # Optimal Volatile Acidity for red and white wines
         self._optimal_acidity_for_quality()
@@ -150,13 +218,7 @@ class WineAnalysis:
         """
         Identifies and displays the optimal volatile acidity levels for red and white wines for the highest quality.
         """
-        optimal_acidity_red = self.df[self.df['wine_type'] == 'red'].groupby('volatile_acidity').agg({'quality': 'mean'}).reset_index()
-        optimal_acidity_red = optimal_acidity_red.sort_values('quality', ascending=False).iloc[0]
-        st.write(f"The optimal volatile acidity level for red wine with the highest quality is **{optimal_acidity_red['volatile_acidity']:.2f}** with an average quality score of **{optimal_acidity_red['quality']:.2f}**.")
-        
-        optimal_acidity_white = self.df[self.df['wine_type'] == 'white'].groupby('volatile_acidity').agg({'quality': 'mean'}).reset_index()
-        optimal_acidity_white = optimal_acidity_white.sort_values('quality', ascending=False).iloc[0]
-        st.write(f"The optimal volatile acidity level for white wine with the highest quality is **{optimal_acidity_white['volatile_acidity']:.2f}** with an average quality score of **{optimal_acidity_white['quality']:.2f}**.")
+        self._optimal_for_quality('volatile_acidity', "volatile acidity level")
     
     def wine_quality_education(self):
         """
@@ -169,11 +231,16 @@ class WineAnalysis:
         st.markdown("""For a deeper understanding of wine quality—including the role of acidity, alcohol, and other factors—visit this [Wikipedia article on Wine Faults and Flaws](https://en.wikipedia.org/wiki/Wine_fault).""")
 
 # ---- Main ---
+@st.cache_resource
+def get_wine_analysis(version):
+    """
+    One WineAnalysis per server process and data version, shared by all sessions.
+    """
+    return WineAnalysis(RED_WINE_PATH, WHITE_WINE_PATH)
+
 def main():
     st.title("🍷 Wine Data Analysis")
-    red_path = "winequality-red.xlsx"
-    white_path = "winequality-white.xlsx"
-    wine_analysis = WineAnalysis(red_path, white_path)
+    wine_analysis = get_wine_analysis(source_version(RED_WINE_PATH, WHITE_WINE_PATH))
     
     # Sidebar 
     st.sidebar.header("Select Analysis (Task 8, 9 & 16)")
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+
+def _round_frac(x, precision):
+    """
+    Rounds a bin edge for display the same way pd.cut labels its intervals.
+    """
+    if not np.isfinite(x) or x == 0:
+        return x
+    frac, whole = np.modf(x)
+    if whole == 0:
+        digits = -int(np.floor(np.log10(abs(frac)))) - 1 + precision
+    else:
+        digits = precision
+    return np.around(x, digits)
+
+
+def _display_breaks(edges, precision=3):
+    """
+    Returns the rounded edges used for labels, raising the precision until they stay distinct.
+    """
+    for p in range(precision, 20):
+        rounded = np.array([_round_frac(edge, p) for edge in edges])
+        if len(np.unique(rounded)) == len(edges):
+            return rounded
+    return edges
+
+
+class HistogramEngine:
+    """
+    Answers equal-width histograms for any numeric column and any bin count.
+    Each column is sorted once; a histogram is then a searchsorted of the bin edges
+    into the sorted values, so changing the bin count never touches the DataFrame.
+    """
+
+    def __init__(self, df):
+        self._df = df
+        self.n_rows = len(df)
+        self._sorted = {}
+
+    def sorted_values(self, column):
+        """
+        Returns the sorted, NaN-free float64 values of a column (computed once per column).
+        """
+        if column not in self._sorted:
+            values = self._df[column].to_numpy(dtype=np.float64)
+            values = values[~np.isnan(values)]
+            values.sort()
+            self._sorted[column] = values
+        return self._sorted[column]
+
+    def edges(self, column, bins):
+        """
+        Returns the bin edges pd.cut(..., bins=bins) would use for this column.
+        """
+        values = self.sorted_values(column)
+        low, high = values[0], values[-1]
+        if low == high:
+            low -= 0.001 * abs(low) if low != 0 else 0.001
+            high += 0.001 * abs(high) if high != 0 else 0.001
+            return np.linspace(low, high, bins + 1)
+
+        edges = np.linspace(low, high, bins + 1)
+        edges[0] -= (high - low) * 0.001
+        return edges
+
+    def counts(self, column, bins):
+        """
+        Returns (edges, counts) for right-closed bins, like pd.cut.
+        """
+        values = self.sorted_values(column)
+        edges = self.edges(column, bins)
+        positions = np.searchsorted(values, edges, side="right")
+        return edges, np.diff(positions)
+
+    def density(self, column, bins):
+        """
+        Returns the share of all rows falling in each bin, indexed by interval.
+        """
+        edges, counts = self.counts(column, bins)
+        index = pd.IntervalIndex.from_breaks(_display_breaks(edges), closed="right", name=f"{column}_bin")
+        return pd.Series(counts / self.n_rows, index=index, name="density")
@@ -0,0 +1,123 @@
+import hashlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+
+# Resultatet af én PCA-kørsel: de fittede objekter og de projicerede koordinater
+PCAResult = namedtuple("PCAResult", ["fingerprint", "scaler", "pca", "coordinates"])
+
+
+def data_fingerprint(df, digest=None):
+    """
+    Returns a SHA-1 fingerprint of a DataFrame's column names and values.
+    Pass the digest of the previous chunk to fingerprint a stream of chunks;
+    the result equals the fingerprint of the concatenated frame.
+    """
+    if digest is None:
+        digest = hashlib.sha1()
+        digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest
+
+
+class PCAService:
+    """
+    Fits StandardScaler + PCA once per distinct dataset and serves the cached result afterwards.
+    With incremental=True the fit runs chunk by chunk through IncrementalPCA, which keeps
+    memory bounded by the chunk size but only approximates the exact PCA.
+    """
+
+    def __init__(self, n_components=2, incremental=False, chunk_size=10_000, max_entries=4):
+        self.n_components = n_components
+        self.incremental = incremental
+        self.chunk_size = chunk_size
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+
+    def _key(self, fingerprint, incremental):
+        return (fingerprint, self.n_components, incremental)
+
+    def _remember(self, result, incremental):
+        key = self._key(result.fingerprint, incremental)
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+        return result
+
+    def _lookup(self, fingerprint, incremental):
+        key = self._key(fingerprint, incremental)
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key]
+        return None
+
+    def fit_transform(self, features):
+        """
+        Returns the PCAResult for a numeric DataFrame, refitting only if its contents changed.
+        """
+        fingerprint = data_fingerprint(features).hexdigest()
+        cached = self._lookup(fingerprint, self.incremental)
+        if cached is not None:
+            return cached
+
+        values = features.to_numpy(dtype=np.float64)
+        if self.incremental:
+            chunks = lambda: (values[i:i + self.chunk_size] for i in range(0, len(values), self.chunk_size))
+            scaler, pca, coordinates = self._fit_chunked(chunks)
+        else:
+            scaler = StandardScaler()
+            pca = PCA(n_components=self.n_components)
+            coordinates = pca.fit_transform(scaler.fit_transform(values))
+
+        return self._remember(PCAResult(fingerprint, scaler, pca, coordinates), self.incremental)
+
+    def fit_chunks(self, make_chunks):
+        """
+        Out-of-core variant for data that does not fit in memory.
+        `make_chunks` is a callable returning a fresh iterator of DataFrame chunks,
+        e.g. lambda: pd.read_csv(path, chunksize=100_000). The data is read three times:
+        once to fingerprint and fit the scaler, once to fit IncrementalPCA, once to project.
+        """
+        digest = None
+        scaler = StandardScaler()
+        for chunk in make_chunks():
+            digest = data_fingerprint(chunk, digest)
+            scaler.partial_fit(chunk.to_numpy(dtype=np.float64))
+
+        fingerprint = digest.hexdigest()
+        cached = self._lookup(fingerprint, True)
+        if cached is not None:
+            return cached
+
+        arrays = lambda: (chunk.to_numpy(dtype=np.float64) for chunk in make_chunks())
+        scaler, pca, coordinates = self._fit_chunked(arrays, scaler=scaler)
+        return self._remember(PCAResult(fingerprint, scaler, pca, coordinates), True)
+
+    def _fit_chunked(self, make_arrays, scaler=None):
+        """
+        Fits the scaler (unless given) and IncrementalPCA chunk by chunk, then projects every chunk.
+        """
+        if scaler is None:
+            scaler = StandardScaler()
+            for values in make_arrays():
+                scaler.partial_fit(values)
+
+        pca = IncrementalPCA(n_components=self.n_components)
+        pending = None
+        for values in make_arrays():
+            # IncrementalPCA kræver mindst n_components rækker pr. kald,
+            # så for små chunks lægges sammen med den forrige
+            if pending is not None and min(len(pending), len(values)) >= self.n_components:
+                pca.partial_fit(scaler.transform(pending))
+                pending = values
+            else:
+                pending = values if pending is None else np.vstack([pending, values])
+        if pending is not None:
+            pca.partial_fit(scaler.transform(pending))
+
+        coordinates = np.vstack([pca.transform(scaler.transform(values)) for values in make_arrays()])
+        return scaler, pca, coordinates
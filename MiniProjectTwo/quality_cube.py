@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+
+class QualityCube:
+    """
+    Pre-aggregated count, sum and mean of a target (quality) for every group (wine type)
+    and every value of every numeric feature, built with a single groupby over the data.
+    """
+
+    def __init__(self, df, group_col="wine_type", target="quality", features=None):
+        self.group_col = group_col
+        self.target = target
+        if features is None:
+            features = [col for col in df.select_dtypes("number").columns if col != target]
+        self.features = list(features)
+
+        self.table = self._aggregate(df)
+        self._best = self._best_per_group()
+
+    def _aggregate(self, df):
+        """
+        Stacks all features into one long frame (group, feature, value, target) and groups it once.
+        """
+        n_rows = len(df)
+        n_features = len(self.features)
+        long = pd.DataFrame({
+            self.group_col: np.tile(df[self.group_col].to_numpy(), n_features),
+            "feature": np.repeat(np.array(self.features, dtype=object), n_rows),
+            "value": df[self.features].to_numpy(dtype=np.float64).ravel(order="F"),
+            self.target: np.tile(df[self.target].to_numpy(dtype=np.float64), n_features),
+        }).dropna(subset=["value", self.target])
+
+        table = long.groupby([self.group_col, "feature", "value"], sort=True)[self.target].agg(["count", "sum"])
+        table["mean"] = table["sum"] / table["count"]
+        return table
+
+    def _best_per_group(self):
+        """
+        Looks up the feature value with the highest mean target for every (group, feature) pair.
+        Ties are broken like the original groupby(...).sort_values(ascending=False).iloc[0]
+        over the values in ascending order, so the chosen value is the same as before.
+        """
+        best = {}
+        for (group, feature), rows in self.table.groupby(level=[0, 1], sort=False):
+            rows = rows.reset_index(level=[0, 1], drop=True).reset_index()
+            row = rows.sort_values("mean", ascending=False).iloc[0]
+            best[(group, feature)] = {"value": float(row["value"]), "mean": float(row["mean"]), "count": int(row["count"])}
+        return best
+
+    def best(self, feature, group):
+        """
+        Returns {'value', 'mean', 'count'} for the value of `feature` with the highest mean target in `group`.
+        """
+        try:
+            return self._best[(group, feature)]
+        except KeyError:
+            raise KeyError(f"No aggregate for feature '{feature}' in group '{group}'") from None
+
+    def groups(self):
+        return sorted({group for group, _ in self._best})
+
+    def feature_table(self, feature, group):
+        """
+        Returns the count/sum/mean rows for one feature within one group, indexed by feature value.
+        """
+        return self.table.xs((group, feature), level=[0, 1])
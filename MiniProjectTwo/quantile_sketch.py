@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+# Kapaciteten på det øverste niveau; op til så mange værdier er sketchen eksakt
+DEFAULT_K = 8192
+
+# Gruppenøglen for sketches over alle rækker
+OVERALL = "all"
+
+
+class KLLSketch:
+    """
+    Mergeable KLL quantile sketch. Memory is bounded by roughly 3 × k values however many
+    values are added; while fewer than k values have been seen the sketch is exact and
+    quantiles match pandas' linear interpolation.
+    """
+
+    def __init__(self, k=DEFAULT_K, c=2 / 3, seed=None):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.compactors = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(2, int(np.ceil(self.k * self.c ** depth)))
+
+    def _compress(self):
+        """
+        Halves every overflowing level: sorts it and promotes every other item (random offset)
+        to the next level with double weight, until all levels fit their capacity.
+        """
+        level = 0
+        while level < len(self.compactors):
+            items = self.compactors[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.compactors):
+                self.compactors.append(np.empty(0))
+
+            items = np.sort(items)
+            # Et ulige antal efterlader ét element på niveauet
+            keep = items[:1] if len(items) % 2 else items[:0]
+            pairs = items[len(keep):]
+            promoted = pairs[self._rng.integers(2)::2]
+            self.compactors[level] = keep
+            self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+            # Kapaciteterne ændrer sig når der kommer et nyt niveau, så start forfra
+            level = 0
+
+    def update(self, values):
+        """
+        Adds an array of values; NaN is ignored.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.n += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Folds another sketch into this one, level by level.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    @property
+    def is_exact(self):
+        return len(self.compactors) == 1
+
+    def quantile(self, q):
+        """
+        Returns the estimated quantile(s) for q in [0, 1].
+        """
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if self.is_exact:
+            return np.quantile(self.compactors[0], q)
+
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self.compactors)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side="left"), len(items) - 1)
+        return items[positions]
+
+
+def build_sketches(chunks, columns=None, group_col=None, k=DEFAULT_K, seed=42):
+    """
+    Builds one KLLSketch per (group, column) in a single pass over an iterable of DataFrame
+    chunks (e.g. pd.read_csv(..., chunksize=...)). The group key OVERALL holds the sketches
+    over all rows, merged from the per-group sketches at the end.
+    """
+    sketches = {}
+    for chunk in chunks:
+        if columns is None:
+            columns = [col for col in chunk.select_dtypes("number").columns if col != group_col]
+        groups = chunk.groupby(group_col, sort=False, observed=True) if group_col else [(OVERALL, chunk)]
+        for group, rows in groups:
+            for column in columns:
+                sketch = sketches.get((group, column))
+                if sketch is None:
+                    sketch = sketches[(group, column)] = KLLSketch(k=k, seed=seed)
+                sketch.update(rows[column].to_numpy(dtype=np.float64))
+
+    if group_col:
+        for (group, column), sketch in list(sketches.items()):
+            overall = sketches.get((OVERALL, column))
+            if overall is None:
+                overall = sketches[(OVERALL, column)] = KLLSketch(k=k, seed=seed)
+            overall.merge(sketch)
+    return sketches
+
+
+def iqr_fences(sketches, whisker=1.5):
+    """
+    Returns Q1, Q3, IQR and the lower/upper fences for every (group, column) sketch.
+    """
+    rows = []
+    for (group, column), sketch in sketches.items():
+        q1, q3 = sketch.quantile([0.25, 0.75])
+        iqr = q3 - q1
+        rows.append({
+            "group": group, "column": column, "q1": q1, "q3": q3, "iqr": iqr,
+            "lower": q1 - whisker * iqr, "upper": q3 + whisker * iqr, "exact": sketch.is_exact,
+        })
+    return pd.DataFrame(rows).set_index(["group", "column"]).sort_index()
+
+
+def outlier_mask(df, fences, columns=None, group_col=None):
+    """
+    Returns a boolean DataFrame (rows × columns) that is True where a value lies outside its fences.
+    With group_col every row is checked against the fences of its own group; otherwise the
+    OVERALL fences are used. All columns are checked in one vectorized comparison.
+    """
+    if columns is None:
+        columns = list(fences.index.get_level_values("column").unique())
+    values = df[columns].to_numpy(dtype=np.float64)
+
+    lower = fences["lower"].unstack("column")[columns]
+    upper = fences["upper"].unstack("column")[columns]
+    if group_col is None:
+        lower, upper = lower.loc[OVERALL].to_numpy(), upper.loc[OVERALL].to_numpy()
+    else:
+        # Slå hver rækkes gruppe op én gang og udvid grænserne til en (rækker × kolonner) matrix
+        codes = lower.index.get_indexer(df[group_col])
+        if (codes < 0).any():
+            raise KeyError(f"No fences for some values of '{group_col}'")
+        lower, upper = lower.to_numpy()[codes], upper.to_numpy()[codes]
+
+    mask = (values < lower) | (values > upper)
+    return pd.DataFrame(mask, index=df.index, columns=columns)
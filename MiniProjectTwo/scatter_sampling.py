@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Over denne grænse sendes ikke længere hver enkelt række til browseren
+DEFAULT_MAX_POINTS = 20_000
+DEFAULT_MAX_ROWS = 5_000
+DEFAULT_GRID = 200
+
+
+def _quantize(values, grid):
+    """
+    Maps values onto `grid` equal-width cells and returns the integer cell of every value.
+    """
+    low, high = np.nanmin(values), np.nanmax(values)
+    if high == low:
+        return np.zeros(len(values), dtype=np.int64)
+    cells = np.floor((values - low) / (high - low) * grid).astype(np.int64)
+    return np.clip(cells, 0, grid - 1)
+
+
+def density_bins(df, x, y, color=None, grid=DEFAULT_GRID):
+    """
+    Aggregates the points into a grid x grid lattice (per color group) on the server.
+    Returns one row per occupied cell with the mean position and the number of points,
+    so the size of the result is bounded by grid² × groups whatever the number of rows.
+    """
+    data = df[[x, y] + ([color] if color else [])].dropna(subset=[x, y])
+    x_values = data[x].to_numpy(dtype=np.float64)
+    y_values = data[y].to_numpy(dtype=np.float64)
+
+    cells = pd.DataFrame({
+        "cell_x": _quantize(x_values, grid),
+        "cell_y": _quantize(y_values, grid),
+        x: x_values,
+        y: y_values,
+    })
+    keys = ["cell_x", "cell_y"]
+    if color:
+        cells[color] = data[color].to_numpy()
+        keys = [color] + keys
+
+    binned = cells.groupby(keys, sort=False).agg(**{x: (x, "mean"), y: (y, "mean"), "count": (x, "size")})
+    return binned.reset_index().drop(columns=["cell_x", "cell_y"])
+
+
+def density_scatter(df, x, y, color=None, title=None, max_points=DEFAULT_MAX_POINTS, grid=DEFAULT_GRID):
+    """
+    Returns (figure, aggregated). Small frames get the usual px.scatter; above max_points
+    the points are binned with density_bins and drawn as a WebGL trace sized by count.
+    """
+    if len(df) <= max_points:
+        return px.scatter(df, x=x, y=y, color=color, title=title), False
+
+    binned = density_bins(df, x, y, color=color, grid=grid)
+    fig = go.Figure()
+    groups = binned.groupby(color, sort=True) if color else [(None, binned)]
+    for name, group in groups:
+        fig.add_trace(go.Scattergl(
+            x=group[x],
+            y=group[y],
+            mode="markers",
+            name=str(name) if name is not None else y,
+            customdata=group["count"],
+            hovertemplate=f"{x}=%{{x:.3f}}<br>{y}=%{{y:.3f}}<br>rows=%{{customdata}}<extra></extra>",
+            marker=dict(
+                size=4 + 16 * np.sqrt(group["count"] / binned["count"].max()),
+                opacity=0.7,
+                line=dict(width=0.5, color="black"),
+            ),
+        ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, legend_title_text=color)
+    return fig, True
+
+
+def preview_rows(df, columns, max_rows=DEFAULT_MAX_ROWS, random_state=42):
+    """
+    Returns the selected columns, or a reproducible random sample of max_rows rows in
+    original order when the frame is larger than that.
+    """
+    if len(df) <= max_rows:
+        return df[columns]
+    return df[columns].sample(max_rows, random_state=random_state).sort_index()
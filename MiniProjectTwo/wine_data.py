@@ -0,0 +1,30 @@
+import os
+import sys
+
+# Repo-roden indeholder de fælles moduler (fx columnar_cache)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from columnar_cache import read_excel_cached
+from dtype_schema import apply_schema
+
+# Stier til Excel-filerne, uafhængigt af hvilken mappe appen startes fra
+WINE_DIR = os.path.dirname(os.path.abspath(__file__))
+RED_WINE_PATH = os.path.join(WINE_DIR, "winequality-red.xlsx")
+WHITE_WINE_PATH = os.path.join(WINE_DIR, "winequality-white.xlsx")
+
+
+def load_wine_workbook(path):
+    """
+    Loads one wine workbook (column names start in row 2) through the columnar cache,
+    with the wine dtypes (float64 measurements, int8 quality, red/white category).
+    """
+    return apply_schema(read_excel_cached(path, header=1), "wine")
+
+
+def load_wine_frames(red_path=RED_WINE_PATH, white_path=WHITE_WINE_PATH):
+    """
+    Returns the raw red and white wine DataFrames.
+    """
+    return load_wine_workbook(red_path), load_wine_workbook(white_path)
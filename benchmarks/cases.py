@@ -0,0 +1,226 @@
+"""
+Benchmark cases. Each case is registered with @benchmark(name) and is a function
+setup(scale) -> (run, rows): it prepares data at `scale` times the original size and returns
+a zero-argument callable that does the measured work, plus the number of input rows.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "MiniProjectTwo"), os.path.join(ROOT_DIR, "MiniProjectThree")):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from columnar_cache import read_excel_cached
+from correlation_service import CorrelationService
+from dtype_schema import apply_schema
+from husleje_data import loadRentData
+from wine_data import RED_WINE_PATH, WHITE_WINE_PATH
+from pca_service import PCAService
+from quantile_sketch import build_sketches, iqr_fences
+from hr_models import (
+    ATTRITION_MODEL_PATH, INCOME_MODEL_PATH, encode_frame, load_encoder, load_model, predict,
+)
+from tree_compiler import compile_tree
+import train_regression_model
+
+# Skalerede testfiler genereres én gang og genbruges mellem kørsler
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fixtures")
+HR_RAW_PATH = os.path.join(ROOT_DIR, "data", "WA_Fn-UseC_-HR-Employee-Attrition.csv")
+HR_CLEAN_PATH = os.path.join(ROOT_DIR, "MiniProjectThree", "data", "attrition_clean.csv")
+RENT_PATH = os.path.join(ROOT_DIR, "Huslejeindeks_2024.csv")
+SU_PATHS = [
+    os.path.join(ROOT_DIR, "data", "SU stipendier og lån (mio. kr.).xlsx"),
+    os.path.join(ROOT_DIR, "data", "Antal støttemodtagere og låntagere.xlsx"),
+    os.path.join(ROOT_DIR, "data", "Støtteårsværk.xlsx"),
+]
+
+CASES = {}
+
+
+def benchmark(name):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def scaled(df, scale):
+    """
+    Returns df repeated `scale` times.
+    """
+    return pd.concat([df] * scale, ignore_index=True) if scale > 1 else df
+
+
+def _fixture(name, scale, write):
+    """
+    Path of a scaled fixture file, created with write(path) the first time it is needed.
+    """
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    stem, ext = os.path.splitext(name)
+    path = os.path.join(FIXTURE_DIR, f"{stem}-x{scale}{ext}")
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp{ext}"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _wine_workbook(scale):
+    # Samme layout som originalen: en titelrække, kolonnenavnene i række 2
+    def write(path):
+        df = scaled(pd.read_excel(RED_WINE_PATH, header=1), scale)
+        df.to_excel(path, index=False, startrow=1)
+    return _fixture("winequality-red.xlsx", scale, write)
+
+
+def _wine_frame(scale):
+    red = read_excel_cached(RED_WINE_PATH, header=1).assign(type="red")
+    white = read_excel_cached(WHITE_WINE_PATH, header=1).assign(type="white")
+    return apply_schema(scaled(pd.concat([red, white], ignore_index=True), scale), "wine")
+
+
+# -------------------- Loaders --------------------
+
+@benchmark("wine_load_excel")
+def wine_load_excel(scale):
+    path = _wine_workbook(scale)
+    return lambda: apply_schema(pd.read_excel(path, header=1), "wine"), 1599 * scale
+
+
+@benchmark("wine_load_cached")
+def wine_load_cached(scale):
+    path = _wine_workbook(scale)
+    cache_dir = os.path.join(FIXTURE_DIR, ".columnar_cache")
+    read_excel_cached(path, cache_dir=cache_dir, header=1)
+    return lambda: apply_schema(read_excel_cached(path, cache_dir=cache_dir, header=1), "wine"), 1599 * scale
+
+
+@benchmark("su_clean_df")
+def su_clean_df(scale):
+    from su_loader import clean_df
+    frames = [scaled(pd.read_excel(path), scale) for path in SU_PATHS]
+    return lambda: [clean_df(df.copy()) for df in frames], sum(len(df) for df in frames)
+
+
+@benchmark("su_load_join")
+def su_load_join(scale):
+    from su_loader import join_on_year, load_workbooks
+
+    # Hver kopi får sine egne år, så året stadig er en unik nøgle
+    def write(source):
+        def write_scaled(path):
+            df = pd.read_excel(source)
+            years = pd.to_numeric(df.iloc[:, 0], errors="coerce")
+            df = df[years.notna()]
+            copies = [df.assign(**{df.columns[0]: years.dropna().astype(int) + 100 * i}) for i in range(scale)]
+            pd.concat(copies, ignore_index=True).to_excel(path, index=False)
+        return write_scaled
+    paths = [_fixture(os.path.basename(source), scale, write(source)) for source in SU_PATHS]
+    rows = sum(len(df) for df in load_workbooks(paths).values())
+    return lambda: join_on_year(load_workbooks(paths).values()), rows
+
+
+@benchmark("rent_load")
+def rent_load(scale):
+    def write(path):
+        rows = pd.read_csv(RENT_PATH, header=None, encoding="utf-8")
+        scaled(rows, scale).to_csv(path, header=False, index=False)
+    path = _fixture("Huslejeindeks_2024.csv", scale, write)
+    # Antal rækker tages fra selve fixturen, så rows/s passer med filen
+    return lambda: loadRentData(path), len(pd.read_csv(path, header=None, encoding="utf-8"))
+
+
+# -------------------- Statistics --------------------
+
+@benchmark("wine_correlation")
+def wine_correlation(scale):
+    df = _wine_frame(scale)
+
+    def run():
+        service = CorrelationService()
+        service.ensure("wine", df, group_col="type")
+        return service.matrix("wine")
+    return run, len(df)
+
+
+@benchmark("wine_iqr_fences")
+def wine_iqr_fences(scale, chunk_size=100_000):
+    df = _wine_frame(scale)
+
+    def run():
+        chunks = (df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size))
+        return iqr_fences(build_sketches(chunks, group_col="type"))
+    return run, len(df)
+
+
+@benchmark("wine_quality_sql")
+def wine_quality_sql(scale):
+    from bi_sql import BIEngine, sql_frame
+
+    engine = BIEngine()
+    df = sql_frame(_wine_frame(scale))
+    engine.register_frame("wine", df)
+    return lambda: engine.query("wine_quality_by_type"), len(df)
+
+
+@benchmark("wine_pca")
+def wine_pca(scale):
+    features = _wine_frame(scale).drop(columns=["type"])
+    return lambda: PCAService(n_components=2).fit_transform(features), len(features)
+
+
+# -------------------- Training --------------------
+
+@benchmark("income_cv_linear")
+def income_cv_linear(scale):
+    X, y = train_regression_model.load_training_data(HR_CLEAN_PATH)
+    X, y = scaled(X, scale), scaled(y.to_frame(), scale)[y.name]
+    grid = train_regression_model.candidate_grid({
+        name: train_regression_model.CANDIDATES[name] for name in ("linear", "ridge")
+    })
+    return lambda: train_regression_model.search(X, y, grid, n_splits=5, n_jobs=1), len(X)
+
+
+@benchmark("income_fit_gradient_boosting")
+def income_fit_gradient_boosting(scale):
+    from sklearn.ensemble import GradientBoostingRegressor
+
+    X, y = train_regression_model.load_training_data(HR_CLEAN_PATH)
+    X, y = scaled(X, scale), scaled(y.to_frame(), scale)[y.name]
+    return lambda: GradientBoostingRegressor(n_estimators=100, max_depth=3, random_state=42).fit(X, y), len(X)
+
+
+# -------------------- Prediction --------------------
+
+def _attrition_inputs(scale):
+    raw = scaled(pd.read_csv(HR_RAW_PATH).drop(columns="Attrition"), scale)
+    return raw, load_model(ATTRITION_MODEL_PATH)
+
+
+@benchmark("attrition_predict_batch")
+def attrition_predict_batch(scale):
+    raw, clf = _attrition_inputs(scale)
+    encoder = load_encoder(ATTRITION_MODEL_PATH)
+    return lambda: predict(clf, encode_frame(raw, encoder).to_numpy(), proba=True), len(raw)
+
+
+@benchmark("attrition_predict_single_rows")
+def attrition_predict_single_rows(scale, rows_per_scale=100):
+    raw, clf = _attrition_inputs(1)
+    encoder = load_encoder(ATTRITION_MODEL_PATH)
+    tree = compile_tree(clf)
+    records = raw.head(rows_per_scale).to_dict("records") * scale
+    return lambda: [tree.predict_proba_one(encoder.transform_one(record)) for record in records], len(records)
+
+
+@benchmark("income_predict_single_rows")
+def income_predict_single_rows(scale, rows_per_scale=100):
+    model = load_model(INCOME_MODEL_PATH)
+    encoder = load_encoder(INCOME_MODEL_PATH)
+    X, _ = train_regression_model.load_training_data(HR_CLEAN_PATH)
+    records = X.head(rows_per_scale).astype(np.float64).to_dict("records") * scale
+    return lambda: [predict(model, encoder.transform_one(record)) for record in records], len(records)
@@ -0,0 +1,133 @@
+"""
+Runs the benchmark suite at several data sizes and records time and peak memory.
+
+Every case is run at each scale (1x, 10x and 100x the original data by default). Time is the
+fastest of several perf_counter runs. Peak memory is measured with tracemalloc in a separate
+run, since tracing slows the code down. Results are written to benchmarks/results/<commit>.json,
+so runs from different commits can be compared with --compare.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --scales 1 10 --filter wine
+    python benchmarks/run.py --compare benchmarks/results/<old commit>.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from cases import CASES, ROOT_DIR
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_SCALES = [1, 10, 100]
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT_DIR, capture_output=True, text=True)
+        return out.stdout.strip() + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure(run, min_time=1.0, max_repeat=10):
+    """
+    Times run() until min_time seconds have passed or max_repeat runs are done (at least once),
+    then measures its peak traced memory in one more run.
+    """
+    times = []
+    while not times or (sum(times) < min_time and len(times) < max_repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    return {
+        "seconds_min": times[0],
+        "seconds_median": times[len(times) // 2],
+        "repeats": len(times),
+        "peak_bytes": peak,
+    }
+
+
+def run_suite(names, scales, min_time=1.0, max_repeat=10):
+    results = []
+    for name in names:
+        for scale in scales:
+            run, rows = CASES[name](scale)
+            result = {"name": name, "scale": scale, "rows": rows, **measure(run, min_time, max_repeat)}
+            results.append(result)
+            print(f"{name:<32} x{scale:<4} {rows:>10,} rows  "
+                  f"{result['seconds_min'] * 1000:>10.2f} ms  {result['peak_bytes'] / 2**20:>9.1f} MB peak")
+            del run
+    return results
+
+
+def compare(results, baseline_path):
+    """
+    Prints the time and memory ratio of every result against a previous results file.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["name"], r["scale"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {os.path.basename(baseline_path)} (ratio > 1 means slower / more memory):")
+    for r in results:
+        old = baseline.get((r["name"], r["scale"]))
+        if old is None:
+            continue
+        time_ratio = r["seconds_min"] / old["seconds_min"] if old["seconds_min"] else float("nan")
+        mem_ratio = r["peak_bytes"] / old["peak_bytes"] if old["peak_bytes"] else float("nan")
+        flag = "  ⚠️" if time_ratio > 1.2 or mem_ratio > 1.2 else ""
+        print(f"{r['name']:<32} x{r['scale']:<4} time {time_ratio:5.2f}x  memory {mem_ratio:5.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Minimum total seconds of timed runs per case")
+    parser.add_argument("--max-repeat", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Results file (default: results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Previous results file to compare with")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    names = [name for name in CASES if args.filter in name]
+    commit = git_commit()
+    results = run_suite(names, args.scales, args.min_time, args.max_repeat)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "results": results,
+        }, f, indent=2)
+    print(f"\n💾 Resultater gemt i {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
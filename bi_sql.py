@@ -0,0 +1,310 @@
+"""
+Embedded SQL engine (DuckDB, in-process and offline) over every BI dataset in the repo.
+
+Workbooks are read through the columnar cache and loaded once into in-memory DuckDB tables.
+Data that already lives on disk as Parquet (the CPI store and the cleaned HR parts) is exposed
+as views that DuckDB scans directly, and the raw HR CSV is scanned with DuckDB's parallel CSV
+reader. Column names are made SQL-friendly (æ/ø/å transliterated, other characters replaced
+by '_'), so they can be used without quoting. Queries run multithreaded and vectorized
+inside DuckDB; every call gets its own cursor, so the engine can be shared between threads.
+
+    python bi_sql.py --tables
+    python bi_sql.py --query rent_vs_cpi_by_quarter
+    python bi_sql.py "SELECT type, avg(alcohol) FROM wine GROUP BY type"
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+
+import duckdb
+import pandas as pd
+
+from columnar_cache import read_excel_cached
+from cpi_store import CPI_STORE_DIR
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+# wine_data ligger i MiniProjectTwo
+WINE_DIR = os.path.join(ROOT_DIR, "MiniProjectTwo")
+if WINE_DIR not in sys.path:
+    sys.path.append(WINE_DIR)
+
+HR_RAW_PATH = os.path.join(ROOT_DIR, "data", "WA_Fn-UseC_-HR-Employee-Attrition.csv")
+HR_CLEAN_DIR = os.path.join(ROOT_DIR, "MiniProjectThree", "data", "attrition_clean")
+HR_CLEAN_PATH = os.path.join(ROOT_DIR, "MiniProjectThree", "data", "attrition_clean.csv")
+RENT_PATH = os.path.join(ROOT_DIR, "Huslejeindeks_2024.csv")
+SU_PATHS = {
+    "su_stipendier": os.path.join(ROOT_DIR, "data", "SU stipendier og lån (mio. kr.).xlsx"),
+    "su_antal": os.path.join(ROOT_DIR, "data", "Antal støttemodtagere og låntagere.xlsx"),
+    "su_aarsvaerk": os.path.join(ROOT_DIR, "data", "Støtteårsværk.xlsx"),
+}
+
+# Antal DuckDB-tråde pr. forespørgsel (standard: alle kerner)
+THREADS = int(os.environ.get("BI_SQL_THREADS", os.cpu_count() or 1))
+
+_DANISH = str.maketrans({"æ": "ae", "ø": "oe", "å": "aa", "Æ": "Ae", "Ø": "Oe", "Å": "Aa"})
+
+# Navngivne analyser, der kan køres med --query eller engine.query(name)
+QUERIES = {
+    "rent_vs_cpi_by_quarter": """
+        -- Huslejeindeks pr. region mod gennemsnittet af fødevareindekset i samme kvartal
+        WITH food AS (
+            SELECT year, quarter, avg("Index") AS food_index, count(DISTINCT Category) AS categories
+            FROM cpi_quarterly
+            GROUP BY year, quarter
+        )
+        SELECT r.Region, r.Kvartal, r."Index" AS rent_index, f.food_index,
+               100 * r."Index" / first_value(r."Index") OVER w AS rent_rebased,
+               100 * f.food_index / first_value(f.food_index) OVER w AS food_rebased
+        FROM rent r
+        LEFT JOIN food f ON f.year = r.year AND f.quarter = r.quarter
+        WINDOW w AS (PARTITION BY r.Region ORDER BY r.year, r.quarter)
+        ORDER BY r.Region, r.year, r.quarter
+    """,
+    "su_per_student_vs_support_years": """
+        -- SU pr. støttemodtager og pr. støtteårsværk (samme beregning som SU-data.py)
+        SELECT Aar,
+               Stipendie_mio_kr,
+               Antal_stoettemodtagere,
+               Stipendie_aarsvaerk,
+               Stipendie_mio_kr * 1e6 / Antal_stoettemodtagere AS SU_pr_student,
+               Stipendie_mio_kr * 1e6 / Stipendie_aarsvaerk AS SU_pr_aarsvaerk,
+               Stipendie_aarsvaerk / Antal_stoettemodtagere AS aarsvaerk_pr_student
+        FROM su
+        WHERE Aar >= 2000 AND Stipendie_mio_kr IS NOT NULL AND Antal_stoettemodtagere IS NOT NULL
+        ORDER BY Aar
+    """,
+    "wine_quality_by_type": """
+        SELECT type, quality, count(*) AS wines, avg(alcohol) AS alcohol,
+               avg(volatile_acidity) AS volatile_acidity, avg(residual_sugar) AS residual_sugar
+        FROM wine
+        GROUP BY type, quality
+        ORDER BY type, quality
+    """,
+    "attrition_by_department": """
+        SELECT Department, JobRole, count(*) AS employees,
+               avg(CASE WHEN Attrition = 'Yes' THEN 1 ELSE 0 END) AS attrition_rate,
+               median(MonthlyIncome) AS median_income
+        FROM hr_raw
+        GROUP BY Department, JobRole
+        ORDER BY attrition_rate DESC
+    """,
+}
+
+
+def sql_name(column):
+    """
+    SQL-friendly column name: 'Stipendie-årsværk' -> 'Stipendie_aarsvaerk', 'fixed acidity' -> 'fixed_acidity'.
+    """
+    name = re.sub(r"[^0-9A-Za-z]+", "_", str(column).translate(_DANISH)).strip("_")
+    return name or "col"
+
+
+def sql_frame(df):
+    """
+    Renames the columns of df with sql_name, keeping names unique.
+    """
+    names, seen = [], {}
+    for column in df.columns:
+        name = sql_name(column)
+        seen[name] = seen.get(name, 0) + 1
+        names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return df.set_axis(names, axis=1)
+
+
+def _quote(path):
+    return "'" + path.replace("'", "''") + "'"
+
+
+# -------------------- Dataset loaders --------------------
+
+def _wine():
+    from wine_data import load_wine_frames
+    red, white = load_wine_frames()
+    wine = pd.concat([red.assign(type="red"), white.assign(type="white")], ignore_index=True)
+    return sql_frame(wine)
+
+
+def _rent():
+    from husleje_data import loadRentData
+    wide = loadRentData(RENT_PATH)
+    long = wide.reset_index().melt(id_vars="Region", var_name="Kvartal", value_name="Index")
+    long["Region"] = long["Region"].astype(str)
+    # DuckDB skelner ikke store/små bogstaver i navne, så kvartalsetiketten hedder 'Kvartal'
+    long["year"] = long["Kvartal"].str[:4].astype("int16")
+    long["quarter"] = long["Kvartal"].str[-1].astype("int8")
+    return long
+
+
+def _su_table(path):
+    # Første kolonne er kalenderåret; rækker uden et år (noter, totaler) droppes
+    df = sql_frame(read_excel_cached(path))
+    df = df.rename(columns={df.columns[0]: "Aar"})
+    years = pd.to_numeric(df["Aar"], errors="coerce")
+    df = df[years.notna()].assign(Aar=years[years.notna()].astype("int16"))
+    return df.reset_index(drop=True)
+
+
+class BIEngine:
+    """
+    One DuckDB database with every BI dataset registered, shared by all threads of a process.
+    """
+
+    def __init__(self, database=":memory:", threads=THREADS):
+        self._con = duckdb.connect(database)
+        self._con.execute(f"SET threads = {int(threads)}")
+        self._lock = threading.Lock()
+        self.load_seconds = {}
+        self.register_all()
+
+    def _timed(self, name, register):
+        start = time.perf_counter()
+        register()
+        self.load_seconds[name] = round(time.perf_counter() - start, 4)
+
+    def _drop(self, name):
+        # DROP VIEW fejler hvis navnet er en tabel (og omvendt), så typen slås op først
+        kind = self._con.execute(
+            "SELECT table_type FROM information_schema.tables WHERE table_schema = 'main' AND table_name = ?", [name]
+        ).fetchone()
+        if kind is not None:
+            self._con.execute(f'DROP {"VIEW" if kind[0] == "VIEW" else "TABLE"} "{name}"')
+
+    def register_frame(self, name, df):
+        """
+        Loads a DataFrame into a DuckDB table (replacing any table or view with that name).
+        """
+        with self._lock:
+            self._drop(name)
+            self._con.register("_incoming", df)
+            try:
+                self._con.execute(f'CREATE OR REPLACE TABLE "{name}" AS SELECT * FROM _incoming')
+            finally:
+                self._con.unregister("_incoming")
+
+    def register_view(self, name, select):
+        with self._lock:
+            self._drop(name)
+            self._con.execute(f'CREATE OR REPLACE VIEW "{name}" AS {select}')
+
+    def register_all(self):
+        self._timed("wine", lambda: self.register_frame("wine", _wine()))
+        self._timed("rent", lambda: self.register_frame("rent", _rent()))
+        for name, path in SU_PATHS.items():
+            self._timed(name, lambda name=name, path=path: self.register_frame(name, _su_table(path)))
+        self.register_view("su", """
+            SELECT * FROM su_stipendier
+            JOIN su_antal USING (Aar)
+            JOIN su_aarsvaerk USING (Aar)
+        """)
+
+        self._timed("hr_raw", lambda: self.register_view(
+            "hr_raw", f"SELECT * FROM read_csv_auto({_quote(HR_RAW_PATH)})"))
+        if os.path.isdir(HR_CLEAN_DIR) and any(name.endswith(".parquet") for name in os.listdir(HR_CLEAN_DIR)):
+            source = f"read_parquet({_quote(os.path.join(HR_CLEAN_DIR, '*.parquet'))})"
+        else:
+            source = f"read_csv_auto({_quote(HR_CLEAN_PATH)})"
+        self._timed("hr_clean", lambda: self.register_view("hr_clean", f"SELECT * FROM {source}"))
+
+        self._timed("cpi", self._register_cpi)
+        self.register_view("cpi_quarterly", """
+            SELECT Category, year(Month) AS year, quarter(Month) AS quarter,
+                   avg("Index") AS "Index", count(*) AS months
+            FROM cpi
+            GROUP BY ALL
+        """)
+
+    def _register_cpi(self, store_dir=CPI_STORE_DIR):
+        # CPI-lageret er allerede Parquet pr. måned; uden data oprettes en tom tabel med samme kolonner
+        pattern = os.path.join(store_dir, "year=*", "*.parquet")
+        has_months = os.path.isdir(store_dir) and any(
+            name.endswith(".parquet")
+            for partition in os.listdir(store_dir) if partition.startswith("year=")
+            for name in os.listdir(os.path.join(store_dir, partition))
+        )
+        if has_months:
+            self.register_view("cpi", f"""
+                SELECT CAST(Category AS VARCHAR) AS Category, CAST(Month AS DATE) AS Month, "Index"
+                FROM read_parquet({_quote(pattern)}, hive_partitioning = false)
+            """)
+        else:
+            with self._lock:
+                self._drop("cpi")
+                self._con.execute('CREATE OR REPLACE TABLE cpi (Category VARCHAR, Month DATE, "Index" DOUBLE)')
+
+    def tables(self):
+        """
+        Registered tables and views with their row counts.
+        """
+        names = self.sql(
+            "SELECT table_name AS name, table_type AS kind FROM information_schema.tables "
+            "WHERE table_schema = 'main' ORDER BY table_name"
+        )
+        names["rows"] = [int(self.sql(f'SELECT count(*) AS n FROM "{name}"')["n"].iloc[0]) for name in names["name"]]
+        return names
+
+    def sql(self, query, params=None):
+        """
+        Runs a query and returns the result as a DataFrame.
+        """
+        cursor = self._con.cursor()
+        try:
+            return cursor.execute(query, params).df() if params else cursor.execute(query).df()
+        finally:
+            cursor.close()
+
+    def query(self, name, params=None):
+        return self.sql(QUERIES[name], params)
+
+    def close(self):
+        self._con.close()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Returns the SQL engine shared by every session in this process.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = BIEngine()
+        return _engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run SQL over the BI datasets.")
+    parser.add_argument("sql", nargs="?", help="SQL to run")
+    parser.add_argument("--query", choices=sorted(QUERIES), help="Run a named analysis")
+    parser.add_argument("--tables", action="store_true", help="List the registered tables and views")
+    parser.add_argument("--output", help="Write the result to a CSV or Parquet file")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if args.tables or not (args.sql or args.query):
+        print(engine.tables().to_string(index=False))
+        return
+
+    start = time.perf_counter()
+    result = engine.query(args.query) if args.query else engine.sql(args.sql)
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        if args.output.endswith(".parquet"):
+            result.to_parquet(args.output, index=False)
+        else:
+            result.to_csv(args.output, index=False)
+        print(f"💾 {len(result)} rækker gemt i {args.output}")
+    else:
+        with pd.option_context("display.max_rows", 200, "display.width", 200):
+            print(result.to_string(index=False))
+    print(f"\n({len(result)} rækker, {elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Mappen hvor de konverterede filer gemmes, ved siden af kildefilen
+CACHE_DIR_NAME = ".columnar_cache"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Returns the SHA-256 hex digest of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(source_path, cache_dir, read_kwargs):
+    """
+    Builds the Feather and metadata paths for a source file and its read options.
+    """
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(source_path)), CACHE_DIR_NAME)
+    options = json.dumps(read_kwargs, sort_keys=True, default=str)
+    key = hashlib.sha1(options.encode("utf-8")).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    base = os.path.join(cache_dir, f"{stem}-{key}")
+    return base + ".feather", base + ".json"
+
+
+def _is_fresh(source_path, data_path, meta_path):
+    """
+    Checks whether the cached copy still matches the source file.
+    A changed mtime alone does not invalidate the cache if the content hash is unchanged.
+    """
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return False
+
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+
+    stat = os.stat(source_path)
+    if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+        return True
+    if meta.get("size") != stat.st_size or meta.get("sha256") != file_digest(source_path):
+        return False
+
+    # Samme indhold, ny mtime (fx efter en git checkout) - opdater blot metadata
+    meta["mtime_ns"] = stat.st_mtime_ns
+    _write_json(meta_path, meta)
+    return True
+
+
+def _write_json(path, payload):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _arrow_safe(df):
+    """
+    Converts object columns with mixed value types to strings so Arrow can store them.
+    Missing values are kept as missing.
+    """
+    df = df.copy()
+    for col in df.columns[df.dtypes == object]:
+        values = df[col].dropna()
+        if values.map(type).nunique() > 1:
+            df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    df.columns = [str(col) for col in df.columns]
+    return df
+
+
+def _convert(source_path, data_path, meta_path, read_kwargs):
+    """
+    Parses the workbook once and writes it as uncompressed Feather so it can be memory-mapped.
+    """
+    df = pd.read_excel(source_path, **read_kwargs)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        table = pa.Table.from_pandas(_arrow_safe(df), preserve_index=False)
+
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    tmp_path = f"{data_path}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, data_path)
+
+    stat = os.stat(source_path)
+    _write_json(meta_path, {
+        "source": os.path.abspath(source_path),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": file_digest(source_path),
+        "read_kwargs": json.loads(json.dumps(read_kwargs, default=str)),
+    })
+
+
+def read_excel_table(source_path, cache_dir=None, **read_kwargs):
+    """
+    Returns the workbook as a memory-mapped Arrow table.
+    The first call converts the workbook to Feather; later calls only map the cached file.
+    """
+    data_path, meta_path = _cache_paths(source_path, cache_dir, read_kwargs)
+    if not _is_fresh(source_path, data_path, meta_path):
+        _convert(source_path, data_path, meta_path, read_kwargs)
+    return feather.read_table(data_path, memory_map=True)
+
+
+def read_excel_cached(source_path, cache_dir=None, **read_kwargs):
+    """
+    Drop-in replacement for pd.read_excel backed by the columnar cache.
+    The saving is the skipped workbook parse, not memory: to_pandas() copies the mapped
+    columns into an ordinary writable DataFrame. Use read_excel_table for zero-copy access.
+    """
+    return read_excel_table(source_path, cache_dir=cache_dir, **read_kwargs).to_pandas()
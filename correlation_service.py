@@ -0,0 +1,174 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from figure_cache import frame_version
+
+
+class CoMoments:
+    """
+    Running count, column means and co-moment matrix (sum of products of deviations)
+    for a fixed set of columns. Batches are combined with the Welford/Chan update,
+    so appending n rows costs O(n × k²) and two instances can be merged exactly.
+
+    Missing values are deleted listwise: a row with NaN in any column is left out of every
+    pair. pandas' DataFrame.corr() deletes pairwise, so on data with NaN the two can differ;
+    drop or impute the NaN first when the results must match pandas.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, values):
+        """
+        Adds a 2-D array of rows (columns in self.columns order). Rows containing NaN are skipped
+        entirely (listwise deletion, see the class docstring).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values) == 0:
+            return self
+
+        batch = CoMoments(self.columns)
+        batch.n = len(values)
+        batch.mean = values.mean(axis=0)
+        centered = values - batch.mean
+        batch.comoment = centered.T @ centered
+        return self.merge(batch)
+
+    def merge(self, other):
+        """
+        Folds another CoMoments over the same columns into this one.
+        """
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.comoment = other.n, other.mean.copy(), other.comoment.copy()
+            return self
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.n * other.n / n)
+        self.mean = self.mean + delta * (other.n / n)
+        self.n = n
+        return self
+
+    def covariance(self):
+        return self.comoment / (self.n - 1) if self.n > 1 else np.full_like(self.comoment, np.nan)
+
+    def correlation(self):
+        """
+        Returns the Pearson correlation matrix as a DataFrame; constant columns give NaN like pandas.
+        """
+        cov = self.covariance()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+
+class CorrelationService:
+    """
+    Keeps CoMoments per dataset (and per group within it) and answers correlation
+    matrices or single target columns from them. Datasets are identified by name and
+    a data version, so a page rerun with unchanged data never recomputes anything.
+    Rows with missing values are left out entirely (listwise), unlike pandas' pairwise .corr().
+    """
+
+    OVERALL = None
+
+    def __init__(self):
+        self._moments = {}
+        self._versions = {}
+        self._group_cols = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def numeric_columns(df):
+        return list(df.select_dtypes(include=["number", "bool"]).columns)
+
+    def _accumulate(self, dataset, df):
+        """
+        Updates the per-group moments with new rows and merges them into the overall moments.
+        """
+        group_col = self._group_cols[dataset]
+        columns = self._moments[(dataset, self.OVERALL)].columns
+        if group_col is None:
+            self._moments[(dataset, self.OVERALL)].update(df[columns].to_numpy(dtype=np.float64))
+            return
+
+        for group, rows in df.groupby(group_col, sort=False, observed=True):
+            batch = CoMoments(columns).update(rows[columns].to_numpy(dtype=np.float64))
+            existing = self._moments.setdefault((dataset, group), CoMoments(columns))
+            existing.merge(batch)
+            self._moments[(dataset, self.OVERALL)].merge(batch)
+
+    def register(self, dataset, df, group_col=None, columns=None, version=None):
+        """
+        (Re)builds the moments for a dataset in one pass over df.
+        """
+        with self._lock:
+            self._rebuild(dataset, df, group_col, columns, version)
+
+    def _rebuild(self, dataset, df, group_col, columns, version):
+        # Kaldes med self._lock holdt
+        columns = columns or self.numeric_columns(df)
+        for key in [key for key in self._moments if key[0] == dataset]:
+            del self._moments[key]
+        self._group_cols[dataset] = group_col
+        self._moments[(dataset, self.OVERALL)] = CoMoments(columns)
+        self._accumulate(dataset, df)
+        self._versions[dataset] = version
+
+    def ensure(self, dataset, df, group_col=None, columns=None, version=None):
+        """
+        Registers df unless the same version of the dataset is already known.
+        Without an explicit version a content hash of df is used, which costs a full pass
+        over df; pages that rerun often should pass a cached version.
+        """
+        version = version or frame_version(df)
+        # Tjek og genopbygning under samme lås, så to sessioner ikke bygger det samme samtidig
+        with self._lock:
+            if self._versions.get(dataset) != version or (dataset, self.OVERALL) not in self._moments:
+                self._rebuild(dataset, df, group_col, columns, version)
+        return self
+
+    def append(self, dataset, df, version=None):
+        """
+        Adds new rows to a registered dataset in O(new rows × features²).
+        """
+        with self._lock:
+            self._accumulate(dataset, df)
+            self._versions[dataset] = version
+
+    def matrix(self, dataset, group=OVERALL, columns=None):
+        with self._lock:
+            corr = self._moments[(dataset, group)].correlation()
+        return corr.loc[columns, columns] if columns is not None else corr
+
+    def column(self, dataset, target, group=OVERALL):
+        """
+        Returns the correlation of every column with `target`.
+        """
+        return self.matrix(dataset, group)[target]
+
+
+_correlation_service = None
+_correlation_service_lock = threading.Lock()
+
+
+def get_correlation_service():
+    """
+    Returns the correlation service shared by every session in this server process.
+    """
+    global _correlation_service
+    with _correlation_service_lock:
+        if _correlation_service is None:
+            _correlation_service = CorrelationService()
+        return _correlation_service
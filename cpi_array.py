@@ -0,0 +1,189 @@
+"""
+The CPI data as a dense category x month NumPy array.
+
+Rows are categories and columns are consecutive calendar months, with NaN where a month is
+missing. Two lookup tables map a category name and a month to their row and column, so one
+series is a single row slice instead of a boolean filter over the long frame. Rates, rolling
+averages and rebasing work on the whole array at once:
+
+    arr = CPIArray.from_store(CPIStore())
+    arr.series("01.1.1 Bread and cereals")
+    arr.yoy().latest()               # year-on-year % for every category
+    arr.rebase("2020").series(...)   # 2020 average = 100
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from cpi_store import CPI_STORE_DIR, CPIStore
+
+
+def _month_number(months):
+    # Løbende månedsnummer, så forskellen mellem to måneder er antal kolonner imellem
+    months = pd.DatetimeIndex(months)
+    return months.year * 12 + months.month - 1
+
+
+class CPIArray:
+    """
+    Dense price index array (n_categories x n_months) with integer lookup tables.
+    """
+
+    def __init__(self, values, categories, months):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.categories = list(categories)
+        self.months = pd.DatetimeIndex(months)
+        self.category_index = {category: row for row, category in enumerate(self.categories)}
+        self.month_index = {month: column for column, month in enumerate(self.months)}
+        self._first_month = _month_number(self.months[:1])[0] if len(self.months) else 0
+
+    @classmethod
+    def from_long(cls, df):
+        """
+        Builds the array from the long format (Category / Month / Index). Months without data
+        inside the covered period become NaN columns, so column offsets are month offsets.
+        """
+        if df.empty:
+            return cls(np.empty((0, 0)), [], pd.DatetimeIndex([]))
+
+        categories = pd.Categorical(df["Category"].astype(str))
+        month_numbers = _month_number(df["Month"])
+        first, last = month_numbers.min(), month_numbers.max()
+        months = pd.date_range(pd.Timestamp(df["Month"].min()).to_period("M").to_timestamp(),
+                               periods=last - first + 1, freq="MS")
+
+        values = np.full((len(categories.categories), len(months)), np.nan)
+        values[categories.codes, np.asarray(month_numbers - first)] = df["Index"].to_numpy(dtype=np.float64)
+        return cls(values, categories.categories, months)
+
+    @classmethod
+    def from_store(cls, store=None, start=None, end=None, categories=None):
+        store = store or CPIStore()
+        return cls.from_long(store.read(start, end, categories))
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def _like(self, values):
+        return CPIArray(values, self.categories, self.months)
+
+    def column(self, month):
+        """
+        Column of a month ('2024-03' or a Timestamp), computed from the month number.
+        """
+        column = _month_number([pd.Timestamp(month)])[0] - self._first_month
+        if not 0 <= column < len(self.months):
+            raise KeyError(f"{pd.Timestamp(month):%Y-%m} is outside {self.months[0]:%Y-%m}–{self.months[-1]:%Y-%m}")
+        return column
+
+    def row(self, category):
+        return self.category_index[category]
+
+    def series(self, category):
+        """
+        The index of one category over all months, as a Series on the month axis.
+        """
+        return pd.Series(self.values[self.row(category)], index=self.months, name=category)
+
+    def value(self, category, month):
+        return self.values[self.row(category), self.column(month)]
+
+    def latest(self):
+        """
+        The last month of every category, as a Series indexed by category.
+        """
+        return pd.Series(self.values[:, -1], index=self.categories, name=f"{self.months[-1]:%Y-%m}")
+
+    # -------------------- Index arithmetic --------------------
+
+    def pct_change(self, periods=1):
+        """
+        Percentage change against `periods` months earlier, for every category at once.
+        """
+        out = np.full_like(self.values, np.nan)
+        if periods < self.values.shape[1]:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out[:, periods:] = (self.values[:, periods:] / self.values[:, :-periods] - 1) * 100
+        return self._like(out)
+
+    def mom(self):
+        return self.pct_change(1)
+
+    def yoy(self):
+        return self.pct_change(12)
+
+    def rolling_mean(self, window, min_periods=None):
+        """
+        Trailing mean over `window` months. Missing months are left out of the mean, and
+        windows with fewer than min_periods values (default: window) are NaN.
+        """
+        min_periods = window if min_periods is None else min_periods
+        present = ~np.isnan(self.values)
+        sums = np.cumsum(np.where(present, self.values, 0.0), axis=1)
+        counts = np.cumsum(present, axis=1)
+
+        # Summen over vinduet er forskellen mellem to kumulerede summer
+        sums[:, window:] = sums[:, window:] - sums[:, :-window]
+        counts[:, window:] = counts[:, window:] - counts[:, :-window]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(counts >= max(min_periods, 1), sums / counts, np.nan)
+        return self._like(mean)
+
+    def rebase(self, base, level=100.0):
+        """
+        Rebases every category so the base period equals `level`. The base is a month
+        ('2020-01') or a year ('2020'), in which case the year's average is the base.
+        """
+        base = str(base)
+        if len(base) == 4:
+            columns = np.flatnonzero(self.months.year == int(base))
+            if columns.size == 0:
+                raise KeyError(f"{base} is outside {self.months[0]:%Y-%m}–{self.months[-1]:%Y-%m}")
+            with np.errstate(invalid="ignore"):
+                base_values = np.nanmean(self.values[:, columns], axis=1)
+        else:
+            base_values = self.values[:, self.column(base)]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._like(self.values / base_values[:, None] * level)
+
+    # -------------------- Conversion --------------------
+
+    def to_frame(self):
+        """
+        Wide DataFrame: one row per category, one column per month.
+        """
+        return pd.DataFrame(self.values, index=pd.Index(self.categories, name="Category"), columns=self.months)
+
+    def to_long(self):
+        long = self.to_frame().rename_axis(columns="Month").stack().rename("Index").reset_index()
+        return long.dropna(subset=["Index"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latest index, month-on-month and year-on-year rates per CPI category.")
+    parser.add_argument("--store", default=CPI_STORE_DIR)
+    parser.add_argument("--rebase", help="Base month or year, e.g. 2020 or 2020-01 (default: the published 2015=100)")
+    parser.add_argument("--window", type=int, default=12, help="Months in the rolling average")
+    args = parser.parse_args()
+
+    arr = CPIArray.from_store(CPIStore(args.store))
+    if not arr.categories:
+        print("The CPI store is empty – ingest a workbook with cpi_store.py first.")
+        return
+    if args.rebase:
+        arr = arr.rebase(args.rebase)
+
+    summary = pd.DataFrame({
+        "Index": arr.latest(),
+        "MoM %": arr.mom().latest(),
+        "YoY %": arr.yoy().latest(),
+        f"{args.window}m mean": arr.rolling_mean(args.window, min_periods=1).latest(),
+    })
+    print(f"Seneste måned: {arr.months[-1]:%Y-%m}")
+    print(summary.round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Headless export of one price index chart per CPI category.
+
+The whole store is read once and split per category. A category is only rendered again when
+the hash of its data (or the chart settings) differs from its last export, so a monthly run
+only redraws the categories that got new months. Charts are rendered with the Agg backend
+across a process pool, and every file is written atomically. manifest.json in the output
+folder records the data hash, file and render time of every chart.
+
+    python cpi_charts.py
+    python cpi_charts.py --format svg --workers 8
+    python cpi_charts.py --force
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cpi_store import CPI_STORE_DIR, ROOT_DIR, CPIStore
+from figure_cache import frame_version
+
+CHART_DIR = os.environ.get("BI_CPI_CHART_DIR", os.path.join(ROOT_DIR, "charts", "cpi"))
+MANIFEST_NAME = "manifest.json"
+
+# Ændres når figurens udseende ændres, så alle grafer tegnes igen
+CHART_STYLE_VERSION = 1
+
+
+def chart_filename(category, fmt):
+    """
+    File name of a category's chart, e.g. 'price_index_0111_Bread_and_cereals.png'.
+    """
+    slug = category.replace(" ", "_").replace(".", "")
+    slug = re.sub(r"[^\w\-]", "_", slug)
+    return f"price_index_{slug}.{fmt}"
+
+
+def chart_hash(subset, fmt, dpi):
+    """
+    Hash of a category's data together with the settings that change the rendered file.
+    """
+    digest = hashlib.sha1(frame_version(subset[["Month", "Index"]]).encode("utf-8"))
+    digest.update(f"{fmt}:{dpi}:{CHART_STYLE_VERSION}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _init_worker():
+    # Ingen skærm i arbejdsprocesserne
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def render_chart(category, subset, path, fmt="png", dpi=100):
+    """
+    Draws the price index of one category and saves it to path. Returns the render time in seconds.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    start = time.perf_counter()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    try:
+        ax.plot(subset["Month"], subset["Index"])
+        ax.set_title(f"Price index over time for: {category}")
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Index (2015=100)")
+        ax.tick_params(axis="x", labelrotation=45)
+        ax.grid(True)
+        fig.tight_layout()
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fig.savefig(tmp_path, format=fmt, dpi=dpi)
+        os.replace(tmp_path, path)
+    finally:
+        plt.close(fig)
+    return time.perf_counter() - start
+
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"charts": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def export_charts(store=None, output_dir=CHART_DIR, fmt="png", dpi=100, workers=None, force=False, categories=None):
+    """
+    Renders the chart of every category whose data changed since its last export.
+    Returns the manifest, which is also written to output_dir.
+    """
+    store = store or CPIStore()
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    charts = manifest.setdefault("charts", {})
+
+    df = store.read(categories=categories)
+    jobs = []
+    for category, subset in df.groupby("Category", sort=True, observed=True):
+        category = str(category)
+        subset = subset.sort_values("Month", ignore_index=True)
+        data_hash = chart_hash(subset, fmt, dpi)
+        filename = chart_filename(category, fmt)
+        previous = charts.get(category, {})
+        unchanged = (
+            previous.get("hash") == data_hash
+            and previous.get("file") == filename
+            and os.path.exists(os.path.join(output_dir, filename))
+        )
+        if unchanged and not force:
+            continue
+        jobs.append((category, subset, filename, data_hash))
+
+    started = time.perf_counter()
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(render_chart, category, subset, os.path.join(output_dir, filename), fmt, dpi):
+                    (category, subset, filename, data_hash)
+                for category, subset, filename, data_hash in jobs
+            }
+            for future in as_completed(futures):
+                category, subset, filename, data_hash = futures[future]
+                charts[category] = {
+                    "file": filename,
+                    "hash": data_hash,
+                    "months": len(subset),
+                    "last_month": f"{subset['Month'].max():%Y-%m}",
+                    "render_seconds": round(future.result(), 4),
+                    "rendered_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                }
+
+    manifest["last_run"] = {
+        "finished": datetime.datetime.now().isoformat(timespec="seconds"),
+        "format": fmt,
+        "dpi": dpi,
+        "categories": int(df["Category"].nunique()),
+        "rendered": len(jobs),
+        "skipped": int(df["Category"].nunique()) - len(jobs),
+        "wall_seconds": round(time.perf_counter() - started, 3),
+    }
+    _write_manifest(output_dir, manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export one price index chart per CPI category.")
+    parser.add_argument("--store", default=CPI_STORE_DIR)
+    parser.add_argument("--output", default=CHART_DIR)
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per CPU)")
+    parser.add_argument("--category", action="append", help="Only export these categories")
+    parser.add_argument("--force", action="store_true", help="Render every chart, also unchanged ones")
+    args = parser.parse_args()
+
+    manifest = export_charts(
+        CPIStore(args.store), args.output, fmt=args.format, dpi=args.dpi,
+        workers=args.workers, force=args.force, categories=args.category,
+    )
+    run = manifest["last_run"]
+    print(f"✅ {run['rendered']} grafer tegnet, {run['skipped']} uændrede sprunget over "
+          f"({run['wall_seconds']:.2f} s) → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
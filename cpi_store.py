@@ -0,0 +1,177 @@
+"""
+Multi-year store for the food price index (CPI) in long format: Category / Month / Index.
+
+Workbooks are ingested incrementally. The month columns (e.g. '2024M01') are detected from
+the header row, whatever period the workbook covers, and only months that are not stored yet
+are added. Each month is one Parquet file under a year partition:
+
+    data/cpi_store/year=2024/2024-01.parquet
+
+so reading a period only opens the files for the months in that period.
+
+    python cpi_store.py ingest FoodPricesIndex2024.xlsx FoodPricesIndex2025.xlsx
+    python cpi_store.py months
+    python cpi_store.py show --start 2023-06 --end 2024-05 --category "01.1.1 Bread and cereals"
+"""
+import argparse
+import os
+import re
+
+import pandas as pd
+
+from dtype_schema import apply_schema
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CPI_STORE_DIR = os.environ.get("BI_CPI_STORE_DIR", os.path.join(ROOT_DIR, "data", "cpi_store"))
+MONTH_PATTERN = re.compile(r"^\s*(\d{4})M(\d{2})\s*$")
+
+# Antal rækker i toppen af arket der undersøges for månedsoverskrifter
+HEADER_SCAN_ROWS = 20
+
+
+def parse_month(label):
+    """
+    Returns the month of a '2024M01' label as a Timestamp, or None if the label is not a month.
+    """
+    match = MONTH_PATTERN.match(str(label))
+    if match is None:
+        return None
+    year, month = int(match.group(1)), int(match.group(2))
+    return pd.Timestamp(year=year, month=month, day=1) if 1 <= month <= 12 else None
+
+
+def read_workbook(path):
+    """
+    Reads a CPI workbook into long format. The header row is the row with the most month
+    labels; the category is the column just before the first month column.
+    """
+    raw = pd.read_excel(path, header=None)
+    scan = raw.head(HEADER_SCAN_ROWS)
+    month_counts = scan.apply(lambda row: sum(parse_month(value) is not None for value in row), axis=1)
+    if month_counts.empty or month_counts.max() == 0:
+        raise ValueError(f"No month columns like '2024M01' found in the first {HEADER_SCAN_ROWS} rows of {path}")
+
+    header_row = int(month_counts.idxmax())
+    header = raw.iloc[header_row]
+    months = {column: parse_month(value) for column, value in header.items() if parse_month(value) is not None}
+    category_column = min(months) - 1
+    if category_column < 0:
+        raise ValueError(f"No category column before the month columns in {path}")
+
+    df = raw.iloc[header_row + 1:, [category_column, *months]]
+    df.columns = ["Category", *months.values()]
+    df = df.dropna(subset=["Category"])
+
+    long = df.melt(id_vars=["Category"], var_name="Month", value_name="Index")
+    long["Month"] = pd.to_datetime(long["Month"])
+    long["Index"] = pd.to_numeric(long["Index"], errors="coerce")
+    long = long.dropna(subset=["Index"])
+    return apply_schema(long, "cpi")
+
+
+class CPIStore:
+    """
+    Long-format CPI history, one Parquet file per month, partitioned by year.
+    """
+
+    def __init__(self, root=CPI_STORE_DIR):
+        self.root = root
+
+    def _month_path(self, month):
+        return os.path.join(self.root, f"year={month.year}", f"{month:%Y-%m}.parquet")
+
+    def months(self):
+        """
+        All stored months, oldest first, found from the file names without reading any data.
+        """
+        months = []
+        if not os.path.isdir(self.root):
+            return months
+        for partition in os.listdir(self.root):
+            if not partition.startswith("year="):
+                continue
+            for name in os.listdir(os.path.join(self.root, partition)):
+                if name.endswith(".parquet"):
+                    months.append(pd.Timestamp(name.removesuffix(".parquet") + "-01"))
+        return sorted(months)
+
+    def _write_month(self, month, df):
+        path = self._month_path(month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    def append(self, long, replace=False):
+        """
+        Stores the months of a long-format frame that are not stored yet (all of them if replace).
+        Returns the months that were written.
+        """
+        stored = set(self.months())
+        written = []
+        for month, rows in long.groupby("Month", sort=True, observed=True):
+            month = pd.Timestamp(month)
+            if month in stored and not replace:
+                continue
+            self._write_month(month, rows.reset_index(drop=True))
+            written.append(month)
+        return written
+
+    def ingest(self, path, replace=False):
+        return self.append(read_workbook(path), replace=replace)
+
+    def read(self, start=None, end=None, categories=None):
+        """
+        Returns the rows between start and end (inclusive months, e.g. '2023-06'), optionally for
+        some categories only. Only the files of the requested months are opened.
+        """
+        start = pd.Timestamp(start).to_period("M").to_timestamp() if start is not None else None
+        end = pd.Timestamp(end).to_period("M").to_timestamp() if end is not None else None
+        months = [
+            month for month in self.months()
+            if (start is None or month >= start) and (end is None or month <= end)
+        ]
+        columns = ["Category", "Month", "Index"]
+        if not months:
+            return apply_schema(pd.DataFrame(columns=columns), "cpi")
+
+        filters = [("Category", "in", list(categories))] if categories is not None else None
+        frames = [pd.read_parquet(self._month_path(month), filters=filters) for month in months]
+        df = pd.concat(frames, ignore_index=True)
+        df["Category"] = df["Category"].astype(str)
+        return apply_schema(df[columns].sort_values(["Category", "Month"], ignore_index=True), "cpi")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest and query the multi-year CPI store.")
+    parser.add_argument("--store", default=CPI_STORE_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Add the new months of one or more workbooks")
+    ingest.add_argument("paths", nargs="+")
+    ingest.add_argument("--replace", action="store_true", help="Overwrite months that are already stored")
+
+    commands.add_parser("months", help="List the stored months")
+
+    show = commands.add_parser("show", help="Print the rows of a period")
+    show.add_argument("--start")
+    show.add_argument("--end")
+    show.add_argument("--category", action="append")
+
+    args = parser.parse_args()
+    store = CPIStore(args.store)
+
+    if args.command == "ingest":
+        for path in args.paths:
+            written = store.ingest(path, replace=args.replace)
+            label = ", ".join(f"{month:%Y-%m}" for month in written) or "ingen nye måneder"
+            print(f"✅ {os.path.basename(path)}: {label}")
+    elif args.command == "months":
+        for month in store.months():
+            print(f"{month:%Y-%m}")
+    else:
+        print(store.read(args.start, args.end, args.category).to_string())
+
+
+if __name__ == "__main__":
+    main()
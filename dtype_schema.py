@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Vintyperne har faste kategorier, så frames med kun én type stadig kan concat'es som category
+WINE_TYPE = pd.CategoricalDtype(["red", "white"])
+
+_WINE_MEASUREMENTS = [
+    "fixed_acidity", "volatile_acidity", "citric_acid", "residual_sugar", "chlorides",
+    "free_sulfur_dioxide", "total_sulfur_dioxide", "density", "ph", "sulphates", "alcohol",
+]
+
+_HR_ORDINALS = [
+    "Age", "DistanceFromHome", "Education", "EmployeeCount", "EnvironmentSatisfaction",
+    "HourlyRate", "JobInvolvement", "JobLevel", "JobSatisfaction", "NumCompaniesWorked",
+    "PercentSalaryHike", "PerformanceRating", "RelationshipSatisfaction", "StandardHours",
+    "StockOptionLevel", "TotalWorkingYears", "TrainingTimesLastYear", "WorkLifeBalance",
+    "YearsAtCompany", "YearsInCurrentRole", "YearsSinceLastPromotion", "YearsWithCurrManager",
+]
+
+_HR_AMOUNTS = ["DailyRate", "EmployeeNumber", "MonthlyIncome", "MonthlyRate"]
+
+_HR_CATEGORIES = [
+    "Attrition", "BusinessTravel", "Department", "EducationField", "Gender",
+    "JobRole", "MaritalStatus", "Over18", "OverTime",
+]
+
+# Én erklæret skema pr. datasæt: kolonnenavn -> kompakt dtype
+SCHEMAS = {
+    "wine": {
+        # Målingerne forbliver float64: float32 flytter værdier over/under IQR-grænser og ændrer korrelationer
+        **{name: "float64" for name in _WINE_MEASUREMENTS},
+        "quality": "int8",
+        "type": WINE_TYPE,
+        "wine_type": WINE_TYPE,
+        "wine_type_encoded": "int8",
+    },
+    "hr_raw": {
+        **{name: "int8" for name in _HR_ORDINALS},
+        **{name: "int16" for name in _HR_AMOUNTS},
+        **{name: "category" for name in _HR_CATEGORIES},
+    },
+    "hr_clean": {
+        **{name: "int8" for name in _HR_ORDINALS},
+        **{name: "int16" for name in _HR_AMOUNTS},
+        "Attrition": "int8",
+        "Gender": "int8",
+        "OverTime": "int8",
+    },
+    "cpi": {
+        "Category": "category",
+        "Index": "float64",
+    },
+    "rent": {
+        "Region": "category",
+    },
+    "su": {
+        "Aar": "int16",
+    },
+}
+
+# Dummy-kolonner (fx 'JobRole_Manager') og kvartalskolonner matches på præfiks/mønster
+_PATTERN_DTYPES = {
+    "hr_clean": [(lambda name: "_" in name and name.split("_")[0] in _HR_CATEGORIES, "bool")],
+    "rent": [(lambda name: len(name) == 6 and name[4] == "K", "float64")],
+}
+
+# Ændres skemaet, skal gemte kopier af de konverterede data (fx i shared_store) bygges igen
+SCHEMA_VERSION = hashlib.sha1(json.dumps({
+    "schemas": {dataset: {name: str(dtype) for name, dtype in schema.items()} for dataset, schema in SCHEMAS.items()},
+    "patterns": {dataset: [dtype for _, dtype in patterns] for dataset, patterns in _PATTERN_DTYPES.items()},
+}, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+
+
+def _normalize(name):
+    return str(name).strip().lower().replace(" ", "_")
+
+
+def _fits(series, dtype):
+    """
+    Checks that an integer column's values fit the target integer dtype (and contain no NaN).
+    """
+    if series.isna().any():
+        return False
+    info = np.iinfo(dtype)
+    return series.min() >= info.min and series.max() <= info.max
+
+
+def schema_for(dataset, columns):
+    """
+    Resolves the target dtype of every column of a dataset that the schema covers.
+    Wine columns are matched case- and space-insensitively, since the pages name them differently.
+    """
+    schema = SCHEMAS[dataset]
+    normalized = {_normalize(name): dtype for name, dtype in schema.items()}
+    resolved = {}
+    for column in columns:
+        dtype = schema.get(column, normalized.get(_normalize(column)) if dataset == "wine" else None)
+        if dtype is None:
+            for matches, pattern_dtype in _PATTERN_DTYPES.get(dataset, []):
+                if matches(str(column)):
+                    dtype = pattern_dtype
+                    break
+        if dtype is not None:
+            resolved[column] = dtype
+    return resolved
+
+
+def apply_schema(df, dataset, strict=False):
+    """
+    Returns df converted to the compact dtypes declared for `dataset`.
+    Integer downcasts are skipped for columns whose values do not fit (or contain NaN),
+    so the schema never changes a value.
+
+    With strict=True every column must be covered by the schema and convertible, otherwise a
+    ValueError is raised. Data written in chunks uses it, so every chunk gets the same dtypes.
+    """
+    schema = schema_for(dataset, df.columns)
+    conversions, unfit = {}, []
+    for column, dtype in schema.items():
+        series = df[column]
+        if isinstance(dtype, str) and dtype.startswith("int"):
+            if not pd.api.types.is_numeric_dtype(series) or not _fits(series, dtype):
+                unfit.append(column)
+                continue
+        elif dtype in ("float32", "float64") and not pd.api.types.is_numeric_dtype(series):
+            unfit.append(column)
+            continue
+        elif dtype == "bool" and not (pd.api.types.is_bool_dtype(series) or set(series.dropna().unique()) <= {0, 1}):
+            unfit.append(column)
+            continue
+        if series.dtype != dtype:
+            conversions[column] = dtype
+    if strict:
+        uncovered = [column for column in df.columns if column not in schema]
+        if uncovered or unfit:
+            raise ValueError(f"Columns not matching the '{dataset}' schema: uncovered {uncovered}, values not fitting {unfit}")
+    return df.astype(conversions) if conversions else df
+
+
+def memory_report(before, after):
+    """
+    Returns the deep memory usage of two versions of a frame and the reduction factor.
+    """
+    before_bytes = int(before.memory_usage(deep=True).sum())
+    after_bytes = int(after.memory_usage(deep=True).sum())
+    return {
+        "before_bytes": before_bytes,
+        "after_bytes": after_bytes,
+        "ratio": before_bytes / after_bytes if after_bytes else float("nan"),
+    }
+
+
+def _format_bytes(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+if __name__ == "__main__":
+    root = os.path.dirname(os.path.abspath(__file__))
+    datasets = [
+        ("wine", os.path.join(root, "MiniProjectTwo", "combined_wine_data.csv")),
+        ("hr_raw", os.path.join(root, "data", "WA_Fn-UseC_-HR-Employee-Attrition.csv")),
+        ("hr_clean", os.path.join(root, "MiniProjectThree", "data", "attrition_clean.csv")),
+    ]
+    for dataset, path in datasets:
+        before = pd.read_csv(path)
+        report = memory_report(before, apply_schema(before, dataset))
+        print(f"{dataset:<10} {_format_bytes(report['before_bytes']):>10} -> "
+              f"{_format_bytes(report['after_bytes']):>10}  ({report['ratio']:.1f}x smaller)")
@@ -0,0 +1,114 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+# Standardbudget for de gemte figurer (kan overskrives med miljøvariablen)
+DEFAULT_MAX_BYTES = int(os.environ.get("FIGURE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+def frame_version(df):
+    """
+    Returns a short content hash of a DataFrame, used as the data version in cache keys.
+    """
+    digest = hashlib.sha1("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+class FigureCache:
+    """
+    Process-wide LRU cache of rendered figures stored as PNG/SVG bytes.
+    Entries are evicted least-recently-used first once the total size exceeds max_bytes,
+    and every figure is closed right after it has been rendered.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(page, section, data_version, **params):
+        return (page, section, data_version, tuple(sorted(params.items())))
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key))
+            # En figur større end hele budgettet gemmes ikke
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def render(self, key, draw, fmt="png", dpi=144):
+        """
+        Returns the rendered bytes for `key`, calling `draw()` (which must return a Figure)
+        only on a cache miss. The figure is closed after rendering.
+        """
+        key = key + (fmt, dpi)
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        fig = draw()
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+        finally:
+            plt.close(fig)
+
+        data = buffer.getvalue()
+        self.put(key, data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_figure_cache = None
+_figure_cache_lock = threading.Lock()
+
+
+def get_figure_cache():
+    """
+    Returns the figure cache shared by every session in this server process.
+    """
+    global _figure_cache
+    with _figure_cache_lock:
+        if _figure_cache is None:
+            _figure_cache = FigureCache()
+        return _figure_cache
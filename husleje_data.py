@@ -1,5 +1,6 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from dtype_schema import apply_schema
 
 def loadRentData(filepath):
     try:
@@ -9,6 +10,7 @@ def loadRentData(filepath):
         df.rename(columns={2: 'Region'}, inplace=True)
         kvartaler = ['2024K1', '2024K2', '2024K3', '2024K4']
         df.columns = ['Region'] + kvartaler
+        df = apply_schema(df, "rent")
 
         df.set_index('Region', inplace=True)
 
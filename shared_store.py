@@ -0,0 +1,121 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+import joblib
+import pyarrow as pa
+
+from dtype_schema import SCHEMA_VERSION
+
+# Arrow-filerne lægges i delt hukommelse (tmpfs), så flere workerprocesser kan mappe de samme sider
+_default_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+SHARED_DIR = os.environ.get("BI_SHARED_STORE_DIR", os.path.join(_default_dir, "bi_shared_store"))
+
+
+def source_version(*paths):
+    """
+    Returns a version string for one or more source files, based on size and mtime.
+    The dtype schema version is included, since the stored frames are already converted.
+    """
+    parts = [f"schema:{SCHEMA_VERSION}"]
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class SharedStore:
+    """
+    Read-only store shared by every session of a server process.
+
+    Each dataset is loaded once, written as an Arrow IPC file under shared_dir and
+    memory-mapped from there, so other worker processes map the same pages instead of
+    loading their own copy. Sessions receive shallow pandas views over the mapped
+    buffers; the buffers are read-only, so a session can add or replace columns on its
+    view but can never modify the shared data in place.
+    Models are loaded once per process and shared the same way.
+    """
+
+    def __init__(self, shared_dir=SHARED_DIR):
+        self.shared_dir = shared_dir
+        self._frames = {}
+        self._models = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _ipc_path(self, name, version):
+        safe_name = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in name)
+        return os.path.join(self.shared_dir, f"{safe_name}@{version}.arrow")
+
+    def _materialize(self, name, version, loader):
+        """
+        Maps the dataset's Arrow file, creating it from loader() if no process has done so yet.
+        """
+        path = self._ipc_path(name, version)
+        if not os.path.exists(path):
+            table = pa.Table.from_pandas(loader(), preserve_index=False)
+            os.makedirs(self.shared_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+            self._remove_stale(name, path)
+        return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+    def _remove_stale(self, name, current_path):
+        """
+        Deletes older versions of a dataset. Processes that still map them keep their pages until they unmap.
+        """
+        prefix = os.path.basename(self._ipc_path(name, "")).removesuffix(".arrow")
+        for entry in os.listdir(self.shared_dir):
+            path = os.path.join(self.shared_dir, entry)
+            if entry.startswith(prefix) and entry.endswith(".arrow") and path != current_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def frame(self, name, loader, version=""):
+        """
+        Returns a view of the named dataset. loader() is called at most once per version
+        across all processes sharing shared_dir.
+        """
+        with self._key_lock(("frame", name)):
+            cached = self._frames.get(name)
+            if cached is None or cached[0] != version:
+                table = self._materialize(name, version, loader)
+                df = table.to_pandas(split_blocks=True, self_destruct=False)
+                cached = self._frames[name] = (version, df)
+        return cached[1].copy(deep=False)
+
+    def model(self, path):
+        """
+        Returns the model stored at path, loaded once per process (and again if the file changes).
+        """
+        version = source_version(path)
+        with self._key_lock(("model", path)):
+            cached = self._models.get(path)
+            if cached is None or cached[0] != version:
+                cached = self._models[path] = (version, joblib.load(path))
+        return cached[1]
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_shared_store():
+    """
+    Returns the store shared by every session in this server process.
+    """
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = SharedStore()
+        return _shared_store
@@ -0,0 +1,128 @@
+"""
+Parallel loader for the SU workbooks.
+
+Every workbook is parsed in its own process (through the columnar cache, and with the calamine
+engine when python-calamine is installed). Its columns are normalized with the same rules as
+before: strip, no newlines, no non-ASCII characters, spaces -> '_'. The mapping from raw to
+normalized headers is cached per header tuple. The cleaned frames are indexed and sorted by
+'Aar' and combined in one multi-way join on that index instead of chained pairwise merges.
+
+    python su_loader.py
+    python su_loader.py data --workers 3
+"""
+import argparse
+import glob
+import importlib.util
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import pandas as pd
+
+from columnar_cache import read_excel_cached
+from dtype_schema import apply_schema
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SU_DATA_DIR = os.environ.get("BI_SU_DATA_DIR", os.path.join(ROOT_DIR, "data"))
+
+# calamine er meget hurtigere end openpyxl, men er en valgfri afhængighed
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
+
+# Under denne samlede filstørrelse koster procesopstarten mere end den sparer
+PARALLEL_MIN_BYTES = int(os.environ.get("BI_SU_PARALLEL_MIN_BYTES", 4 * 1024 * 1024))
+
+_NON_ASCII = re.compile(r"[^\x00-\x7F]+")
+
+
+@lru_cache(maxsize=None)
+def normalized_columns(columns):
+    """
+    Normalized names for a tuple of raw headers; the first column becomes 'Aar'.
+    """
+    names = [_NON_ASCII.sub("", str(name).strip().replace("\n", "")).replace(" ", "_") for name in columns]
+    if names:
+        names[0] = "Aar"
+    return tuple(names)
+
+
+def clean_df(df):
+    """
+    Normalizes the column names and keeps only the rows with a numeric year in 'Aar'.
+    """
+    df = df.set_axis(normalized_columns(tuple(df.columns)), axis=1)
+    years = pd.to_numeric(df["Aar"], errors="coerce")
+    df = df[years.notna()].copy()
+    df["Aar"] = years[years.notna()].astype(int)
+    return apply_schema(df, "su")
+
+
+def load_workbook(path):
+    read_kwargs = {"engine": EXCEL_ENGINE} if EXCEL_ENGINE else {}
+    return clean_df(read_excel_cached(path, **read_kwargs))
+
+
+def workbook_paths(directory=SU_DATA_DIR):
+    return sorted(path for path in glob.glob(os.path.join(directory, "*.xlsx")) if not os.path.basename(path).startswith("~$"))
+
+
+def load_workbooks(paths=None, workers=None):
+    """
+    Parses the workbooks in parallel and returns {path: cleaned DataFrame} in the given order.
+    By default the process pool is only used when the workbooks together are at least
+    PARALLEL_MIN_BYTES; small workbooks are parsed in this process.
+    """
+    paths = list(paths) if paths is not None else workbook_paths()
+    if workers is None:
+        total_bytes = sum(os.path.getsize(path) for path in paths)
+        workers = min(len(paths), os.cpu_count() or 1) if total_bytes >= PARALLEL_MIN_BYTES else 1
+    if workers <= 1 or len(paths) <= 1:
+        return {path: load_workbook(path) for path in paths}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(load_workbook, paths)))
+
+
+def join_on_year(frames, how="inner"):
+    """
+    Joins the frames in one pass on the sorted 'Aar' index. Returns 'Aar' as a column again.
+    """
+    indexed, year_dtype = [], None
+    for df in frames:
+        year_dtype = year_dtype or df["Aar"].dtype
+        df = df.set_index("Aar")
+        if not df.index.is_unique:
+            raise ValueError(f"Duplicate years in the SU data: {sorted(df.index[df.index.duplicated()].unique())}")
+        indexed.append(df if df.index.is_monotonic_increasing else df.sort_index())
+    joined = pd.concat(indexed, axis=1, join=how).sort_index()
+    # Indekset bliver int64; behold det kompakte skema-dtype for 'Aar'
+    if year_dtype is not None:
+        joined.index = joined.index.astype(year_dtype)
+    return joined.reset_index()
+
+
+def load_su(paths=None, workers=None):
+    """
+    All SU workbooks joined on the year.
+    """
+    return join_on_year(load_workbooks(paths, workers).values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and join every SU workbook in a directory.")
+    parser.add_argument("directory", nargs="?", default=SU_DATA_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    frames = load_workbooks(workbook_paths(args.directory), args.workers)
+    merged = join_on_year(frames.values())
+    elapsed = time.perf_counter() - start
+
+    for path, df in frames.items():
+        print(f"{os.path.basename(path)}: {len(df)} rækker, {df.shape[1] - 1} kolonner")
+    print(f"\n✅ {len(merged)} år × {merged.shape[1]} kolonner på {elapsed:.2f} s (engine: {EXCEL_ENGINE or 'openpyxl'})")
+
+
+if __name__ == "__main__":
+    main()
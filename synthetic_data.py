@@ -0,0 +1,320 @@
+"""
+Schema-preserving synthetic data for load testing.
+
+SyntheticModel learns each column's type and marginal distribution plus the joint dependence
+between columns (a Gaussian copula over normal scores). It then samples any number of rows with
+the same columns, dtypes and value ranges. Continuous columns are drawn through their empirical
+quantile function. Low-cardinality numeric columns and categoricals keep their exact values and
+frequencies. Unique text identifiers are regenerated as new unique strings.
+
+generate() writes the rows in parallel chunks: one Parquet file per chunk under a directory, or
+a single CSV assembled from the chunk files in order.
+
+    python synthetic_data.py wine --rows 10000000 --output synthetic/wine --format parquet
+    python synthetic_data.py hr --rows 1000000 --output synthetic/hr.csv --workers 4
+    python synthetic_data.py cpi --source FoodPricesIndex2024.xlsx --rows 5000 --output synthetic/cpi.csv
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Numeriske kolonner med få forskellige værdier (fx kvalitet, uddannelsesniveau) samples som diskrete
+MAX_DISCRETE_VALUES = 64
+QUANTILES = 1024
+
+# Kun filer med dette navn skrives (og ryddes op) af generate()
+PART_PATTERN = re.compile(r"^part-\d{5}\.(parquet|csv)$")
+
+
+def _load_cpi(path):
+    # Månedskolonnerne findes fra overskriften (som i cpi_store), uanset hvilke år arket dækker
+    from cpi_store import read_workbook
+    long = read_workbook(path)
+    wide = long.pivot(index="Category", columns="Month", values="Index")
+    wide.columns = [f"{month:%Y}M{month:%m}" for month in wide.columns]
+    return wide.reset_index().assign(Category=lambda df: df["Category"].astype(str))
+
+
+def _load_rent(path):
+    from husleje_data import loadRentData
+    return loadRentData(path).reset_index()
+
+
+DATASETS = {
+    "wine": (os.path.join(ROOT_DIR, "MiniProjectTwo", "combined_wine_data.csv"), pd.read_csv),
+    "hr": (os.path.join(ROOT_DIR, "data", "WA_Fn-UseC_-HR-Employee-Attrition.csv"), pd.read_csv),
+    "rent": (os.path.join(ROOT_DIR, "Huslejeindeks_2024.csv"), _load_rent),
+    "su_stipendier": (os.path.join(ROOT_DIR, "data", "SU stipendier og lån (mio. kr.).xlsx"), pd.read_excel),
+    "su_antal": (os.path.join(ROOT_DIR, "data", "Antal støttemodtagere og låntagere.xlsx"), pd.read_excel),
+    "su_aarsvaerk": (os.path.join(ROOT_DIR, "data", "Støtteårsværk.xlsx"), pd.read_excel),
+    # CPI-arbejdsbogen ligger ikke i repoet - angiv stien med --source
+    "cpi": (None, _load_cpi),
+}
+
+
+def load_dataset(name, source=None):
+    default_path, loader = DATASETS[name]
+    path = source or default_path
+    if path is None:
+        raise ValueError(f"Dataset '{name}' has no bundled file; pass its path with --source")
+    return loader(path)
+
+
+class SyntheticModel:
+    """
+    Column specs plus the copula correlation matrix, learned from one DataFrame.
+    """
+
+    def __init__(self, columns, correlation):
+        self.columns = columns
+        self.correlation = np.asarray(correlation, dtype=np.float64)
+        self._cholesky = np.linalg.cholesky(self.correlation)
+
+    @staticmethod
+    def _column_spec(name, series):
+        missing = float(series.isna().mean())
+        values = series.dropna()
+        spec = {"name": name, "dtype": str(series.dtype), "missing": missing}
+
+        if pd.api.types.is_bool_dtype(series) or not pd.api.types.is_numeric_dtype(series):
+            if values.nunique() == len(values) and len(values) > MAX_DISCRETE_VALUES:
+                return {**spec, "kind": "identifier", "prefix": f"{name}_"}
+            counts = values.astype(str).value_counts(sort=False).sort_index()
+            return {**spec, "kind": "categorical", "values": counts.index.tolist(),
+                    "probabilities": (counts / counts.sum()).tolist()}
+
+        unique = np.unique(values.to_numpy())
+        if len(unique) <= MAX_DISCRETE_VALUES:
+            counts = values.value_counts().reindex(unique)
+            return {**spec, "kind": "discrete", "values": unique.tolist(),
+                    "probabilities": (counts / counts.sum()).tolist()}
+
+        quantiles = np.quantile(values.to_numpy(dtype=np.float64), np.linspace(0, 1, QUANTILES))
+        return {**spec, "kind": "continuous", "quantiles": quantiles.tolist(),
+                "integer": bool(pd.api.types.is_integer_dtype(series))}
+
+    @staticmethod
+    def _normal_scores(series, spec):
+        """
+        Maps a column to standard normal scores: ranks for continuous columns, the middle of
+        each value's probability interval for discrete and categorical ones.
+        """
+        n = len(series)
+        scores = np.zeros(n)
+        present = series.notna().to_numpy()
+        if spec["kind"] == "continuous":
+            ranks = series[present].rank(method="average").to_numpy()
+            scores[present] = ndtri(ranks / (present.sum() + 1))
+        elif spec["kind"] in ("discrete", "categorical"):
+            cumulative = np.concatenate([[0.0], np.cumsum(spec["probabilities"])])
+            middle = np.clip((cumulative[:-1] + cumulative[1:]) / 2, 1e-9, 1 - 1e-9)
+            values = series[present]
+            keys = values.astype(str) if spec["kind"] == "categorical" else values
+            positions = pd.Index(spec["values"]).get_indexer(keys)
+            scores[present] = ndtri(middle[positions])
+        return scores
+
+    @classmethod
+    def _score_correlation(cls, df, columns):
+        scores = np.column_stack([cls._normal_scores(df[spec["name"]], spec) for spec in columns])
+        if len(df) < 2:
+            return np.eye(len(columns))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlation = np.nan_to_num(np.corrcoef(scores, rowvar=False), nan=0.0)
+        np.fill_diagonal(correlation, 1.0)
+        return correlation
+
+    @staticmethod
+    def _nearest_correlation(matrix):
+        # Nærmeste positivt definitte matrix, så Cholesky altid lykkes
+        eigenvalues, eigenvectors = np.linalg.eigh((matrix + matrix.T) / 2)
+        matrix = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+        d = np.sqrt(np.diag(matrix))
+        return matrix / np.outer(d, d)
+
+    @classmethod
+    def fit(cls, df, calibration_rows=20_000, calibration_rounds=3, seed=0):
+        """
+        Learns the column specs and the copula correlation from df.
+
+        Discrete and categorical columns lose part of the dependence when the latent normal
+        values are cut into a few levels, so the correlation is calibrated: sample, measure the
+        same score correlation on the synthetic rows, and shift the latent matrix by the gap.
+        """
+        df = df.rename(columns=str)
+        columns = [cls._column_spec(name, df[name]) for name in df.columns]
+        target = cls._score_correlation(df, columns)
+        model = cls(columns, cls._nearest_correlation(target))
+
+        if any(spec["kind"] in ("discrete", "categorical") for spec in columns):
+            for round_ in range(calibration_rounds):
+                synthetic = model.sample(calibration_rows, seed=seed + round_)
+                gap = target - cls._score_correlation(synthetic, columns)
+                latent = np.clip(model.correlation + gap, -0.999, 0.999)
+                np.fill_diagonal(latent, 1.0)
+                model = cls(columns, cls._nearest_correlation(latent))
+        return model
+
+    def sample(self, n, seed=None, start=0):
+        """
+        Draws n rows. `start` is the row number of the first row, used for identifier columns.
+        """
+        rng = np.random.default_rng(seed)
+        u = ndtr(rng.standard_normal((n, len(self.columns))) @ self._cholesky.T)
+
+        data = {}
+        for j, spec in enumerate(self.columns):
+            column = u[:, j]
+            kind = spec["kind"]
+            if kind == "continuous":
+                grid = np.linspace(0, 1, len(spec["quantiles"]))
+                values = np.interp(column, grid, spec["quantiles"])
+                values = pd.Series(np.round(values) if spec["integer"] else values)
+            elif kind in ("discrete", "categorical"):
+                cumulative = np.cumsum(spec["probabilities"])
+                index = np.minimum(np.searchsorted(cumulative, column, side="right"), len(cumulative) - 1)
+                values = pd.Series(np.asarray(spec["values"], dtype=object if kind == "categorical" else None)[index])
+            else:
+                values = pd.Series([f"{spec['prefix']}{i}" for i in range(start, start + n)])
+
+            if spec["missing"]:
+                values = values.where(rng.random(n) >= spec["missing"])
+            data[spec["name"]] = self._cast(values, spec)
+        return pd.DataFrame(data)
+
+    @staticmethod
+    def _cast(values, spec):
+        dtype = spec["dtype"]
+        if dtype == "category":
+            return values.astype("category")
+        if dtype in ("bool", "boolean"):
+            # Kategoriske værdier samples som tekst; astype(bool) ville gøre "False" til True
+            flags = values.map({"True": True, "False": False, True: True, False: False})
+            return flags.astype("boolean") if flags.isna().any() or dtype == "boolean" else flags.astype(bool)
+        if dtype.startswith(("int", "uint")) and values.isna().any():
+            return values.astype("Int64")
+        try:
+            return values.astype(dtype)
+        except (TypeError, ValueError):
+            return values
+
+    def to_dict(self):
+        return {"columns": self.columns, "correlation": self.correlation.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["columns"], data["correlation"])
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def _write_chunk(model_data, rows, start, seed, path, fmt):
+    # Kører i en workerproces; modellen sendes som dict, så den er billig at pickle
+    model = SyntheticModel.from_dict(model_data)
+    df = model.sample(rows, seed=seed, start=start)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, header=False)
+    return rows
+
+
+def _prepare_parts_dir(parts_dir):
+    """
+    Creates parts_dir, or empties it of part files from an earlier run. A directory holding
+    anything else was not made by this tool and is refused instead of deleted.
+    """
+    if os.path.isdir(parts_dir):
+        names = os.listdir(parts_dir)
+        foreign = [name for name in names if not PART_PATTERN.match(name)]
+        if foreign:
+            raise ValueError(
+                f"{parts_dir} contains files not written by synthetic_data.py ({', '.join(sorted(foreign)[:3])}"
+                f"{', ...' if len(foreign) > 3 else ''}); choose an empty or new output directory"
+            )
+        # Dele fra en tidligere, større kørsel må ikke blive liggende
+        for name in names:
+            os.remove(os.path.join(parts_dir, name))
+    elif os.path.exists(parts_dir):
+        raise ValueError(f"{parts_dir} exists and is not a directory")
+    os.makedirs(parts_dir, exist_ok=True)
+
+
+def generate(model, output, rows, fmt="parquet", chunk_rows=500_000, workers=None, seed=0):
+    """
+    Writes `rows` synthetic rows to output in parallel chunks and returns the number written.
+    Parquet output is a directory of part files; CSV output is one file, assembled in chunk order.
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).spawn((rows + chunk_rows - 1) // chunk_rows)
+    parts_dir = output if fmt == "parquet" else f"{output}.parts"
+    _prepare_parts_dir(parts_dir)
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    model_data = model.to_dict()
+
+    parts = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for i, start in enumerate(range(0, rows, chunk_rows)):
+            path = os.path.join(parts_dir, f"part-{i:05d}.{'parquet' if fmt == 'parquet' else 'csv'}")
+            parts.append(path)
+            futures.append(pool.submit(_write_chunk, model_data, min(chunk_rows, rows - start), start, seeds[i], path, fmt))
+        written = sum(future.result() for future in futures)
+
+    if fmt == "csv":
+        with open(output, "w", encoding="utf-8", newline="") as out:
+            out.write(",".join(spec["name"] for spec in model.columns) + "\n")
+            for path in parts:
+                with open(path, encoding="utf-8") as part:
+                    shutil.copyfileobj(part, out)
+        for path in parts:
+            os.remove(path)
+        os.rmdir(parts_dir)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate large synthetic versions of the bundled datasets.")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--output", required=True, help="CSV file or Parquet directory")
+    parser.add_argument("--format", choices=["parquet", "csv"], default=None, help="Default: from the output suffix")
+    parser.add_argument("--source", default=None, help="Source file (required for cpi)")
+    parser.add_argument("--chunk-rows", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--spec", default=None, help="Also save the learned model as JSON")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.output.endswith(".csv") else "parquet")
+    model = SyntheticModel.fit(load_dataset(args.dataset, args.source))
+    if args.spec:
+        model.save(args.spec)
+
+    start = time.perf_counter()
+    written = generate(model, args.output, args.rows, fmt, args.chunk_rows, args.workers, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {written:,} syntetiske '{args.dataset}'-rækker skrevet til {args.output} "
+          f"på {elapsed:.1f}s ({written / elapsed:,.0f} rækker/s)")
+
+
+if __name__ == "__main__":
+    main()